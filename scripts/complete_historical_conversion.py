@@ -13,15 +13,64 @@ import git
 import yaml
 import json
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 import tempfile
 import shutil
+import subprocess
+import time
 from typing import Dict, List, Tuple, Any, Optional
 import re
 
 # Add src to path for existing utilities
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+from parsers.msl_parser import EXCEL_ENGINE
+
+TAXONOMY_RANKS = ['realm', 'kingdom', 'phylum', 'class', 'order', 'family', 'subfamily', 'genus']
+
+# Scalars that PyYAML would emit unquoted; anything else goes through the dumper
+_PLAIN_SCALAR = re.compile(r"[A-Za-z][A-Za-z0-9 _.()/,;+'-]*")
+_YAML_LINE_WIDTH = 80
+_YAML_RESOLVER = yaml.resolver.Resolver()
+
+
+def _plain_scalar(prefix: str, value: Any) -> Optional[str]:
+    """Return the plain YAML form of value after prefix, or None if it needs the dumper"""
+    if type(value) is int:
+        text = str(value)
+    elif type(value) is str and _PLAIN_SCALAR.fullmatch(value) and not value.endswith(' '):
+        if _YAML_RESOLVER.resolve(yaml.ScalarNode, value, (True, False)) != 'tag:yaml.org,2002:str':
+            return None
+        text = value
+    else:
+        return None
+    
+    line = f"{prefix}{text}\n"
+    if len(line) > _YAML_LINE_WIDTH:
+        return None
+    return line
+
+
+def _format_species_yaml(scientific_name: str, taxonomy: Dict[str, Any], metadata: Dict[str, Any]) -> bytes:
+    """Render a species record to YAML bytes without the generic PyYAML emitter"""
+    lines = [_plain_scalar('scientific_name: ', scientific_name)]
+    
+    if taxonomy:
+        lines.append('taxonomy:\n')
+        lines.extend(_plain_scalar(f"  {rank}: ", value) for rank, value in taxonomy.items())
+    
+    lines.append('metadata:\n')
+    lines.extend(_plain_scalar(f"  {key}: ", value) for key, value in metadata.items())
+    
+    if not taxonomy or None in lines:
+        # Quoting, escaping or line folding required: defer to PyYAML's pure-Python
+        # emitter, which libyaml does not match byte for byte on escaped strings
+        record = {'scientific_name': scientific_name, 'taxonomy': taxonomy, 'metadata': metadata}
+        return yaml.dump(record, encoding='utf-8', default_flow_style=False, sort_keys=False)
+    
+    return ''.join(lines).encode('utf-8')
+
+
 class HistoricalMSLConverter:
     """Convert all historical MSL files to git repository"""
     
@@ -171,7 +220,7 @@ class HistoricalMSLConverter:
         
         try:
             # Read Excel file to analyze structure
-            excel_file = pd.ExcelFile(file_path)
+            excel_file = pd.ExcelFile(file_path, engine=EXCEL_ENGINE)
             
             analysis = {
                 'msl_version': msl_version,
@@ -185,11 +234,11 @@ class HistoricalMSLConverter:
             # Analyze each sheet
             for sheet_name in excel_file.sheet_names:
                 try:
-                    df = pd.read_excel(file_path, sheet_name=sheet_name, nrows=5)
+                    df = pd.read_excel(file_path, sheet_name=sheet_name, nrows=5, engine=EXCEL_ENGINE)
                     analysis['columns'][sheet_name] = list(df.columns)
                     
                     # Get full row count
-                    df_full = pd.read_excel(file_path, sheet_name=sheet_name)
+                    df_full = pd.read_excel(file_path, sheet_name=sheet_name, engine=EXCEL_ENGINE)
                     analysis['row_counts'][sheet_name] = len(df_full)
                     
                 except Exception as e:
@@ -228,19 +277,31 @@ class HistoricalMSLConverter:
         
         return standardized_df
     
-    def create_species_yaml(self, species_data: pd.Series, msl_version: str) -> Dict[str, Any]:
-        """Create YAML structure for a species"""
+    def clean_text_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Strip taxonomy/metadata text once per DataFrame; blank cells become NA
+        
+        Rank columns are stored as categoricals so each distinct name is held once.
+        """
+        text_columns = [col for col in self.column_mappings if col in df.columns]
+        df[text_columns] = df[text_columns].astype('string').apply(lambda s: s.str.strip()).replace('', pd.NA)
+        rank_columns = [col for col in TAXONOMY_RANKS if col in df.columns]
+        df[rank_columns] = df[rank_columns].astype('category')
+        return df
+    
+    def create_species_yaml(self, species_data: Dict[str, Any], msl_version: str) -> Tuple[Dict[str, Any], str]:
+        """Create YAML structure for a species (expects a row from clean_text_columns)"""
         
         # Clean species name for filename
-        species_name = str(species_data.get('species', 'unknown_species')).strip()
+        species_name = species_data.get('species', 'unknown_species')
         safe_name = re.sub(r'[^\w\-_]', '_', species_name.lower())
         
         # Build taxonomy hierarchy
         taxonomy = {}
-        for rank in ['realm', 'kingdom', 'phylum', 'class', 'order', 'family', 'subfamily', 'genus']:
+        for rank in TAXONOMY_RANKS:
             value = species_data.get(rank)
-            if pd.notna(value) and str(value).strip():
-                taxonomy[rank] = str(value).strip()
+            if isinstance(value, str):
+                # Interned so rank names are shared across species and MSL versions
+                taxonomy[rank] = sys.intern(value)
         
         # Create species record
         species_record = {
@@ -257,35 +318,35 @@ class HistoricalMSLConverter:
         # Add optional fields
         for field in ['genome_composition', 'host', 'exemplar', 'isolate']:
             value = species_data.get(field)
-            if pd.notna(value) and str(value).strip():
-                species_record['metadata'][field] = str(value).strip()
+            if isinstance(value, str):
+                species_record['metadata'][field] = value
         
         return species_record, safe_name
     
-    def create_directory_structure(self, species_data: pd.Series) -> Path:
-        """Create hierarchical directory structure for species"""
-        
-        # Build path from taxonomy
-        path_parts = ['realms']
+    def create_directory_paths(self, df: pd.DataFrame) -> pd.Series:
+        """Create hierarchical species directory paths for every row of a cleaned DataFrame"""
+        paths = pd.Series('realms', index=df.index, dtype=object)
         
-        taxonomy_ranks = ['realm', 'kingdom', 'phylum', 'class', 'order', 'family', 'subfamily', 'genus']
-        
-        for rank in taxonomy_ranks:
-            value = species_data.get(rank)
-            if pd.notna(value) and str(value).strip():
-                safe_value = re.sub(r'[^\w\-_]', '_', str(value).lower())
-                if rank == 'realm':
-                    path_parts.append(safe_value)
-                else:
-                    path_parts.extend([f"{rank}s", safe_value])
+        for rank in TAXONOMY_RANKS:
+            if rank not in df.columns:
+                continue
+            
+            # Sanitize each distinct name once and broadcast it through the categorical codes
+            column = df[rank]
+            prefix = '/' if rank == 'realm' else f"/{rank}s/"
+            segments = {value: prefix + re.sub(r'[^\w\-_]', '_', value.lower())
+                        for value in column.cat.categories}
+            paths = paths + column.map(segments).astype(object).fillna('')
         
         # Add species directory
-        path_parts.append('species')
-        
-        return Path(*path_parts)
+        return paths + '/species'
     
     def convert_msl_to_yaml(self, msl_version: str) -> Dict[str, Any]:
-        """Convert single MSL file to YAML structure"""
+        """Convert single MSL file to YAML structure
+        
+        Nothing is written to disk; the rendered files are returned under
+        'yaml_files' as a {relative_path: yaml_bytes} mapping.
+        """
         print(f"\n🔄 Converting {msl_version}...")
         
         file_path = self.data_dir / 'raw' / self.msl_files[msl_version]['file']
@@ -295,7 +356,7 @@ class HistoricalMSLConverter:
         
         try:
             # Try to find main data sheet
-            excel_file = pd.ExcelFile(file_path)
+            excel_file = pd.ExcelFile(file_path, engine=EXCEL_ENGINE)
             main_sheet = None
             
             # Look for main data sheet
@@ -308,10 +369,11 @@ class HistoricalMSLConverter:
                 main_sheet = excel_file.sheet_names[0]  # Use first sheet as fallback
             
             print(f"   📊 Reading sheet: {main_sheet}")
-            df = pd.read_excel(file_path, sheet_name=main_sheet)
+            df = pd.read_excel(file_path, sheet_name=main_sheet, engine=EXCEL_ENGINE)
             
-            # Standardize columns
+            # Standardize columns and clean text cells in one vectorized pass
             df = self.standardize_columns(df, msl_version)
+            df = self.clean_text_columns(df)
             
             # Remove empty rows
             df = df.dropna(subset=['species'])
@@ -324,27 +386,25 @@ class HistoricalMSLConverter:
                 'species_files_created': 0,
                 'errors': [],
                 'families': set(),
-                'genera': set()
+                'genera': set(),
+                # Committed straight from memory by create_git_repository()
+                'yaml_files': {}
             }
             
-            # Create base directory for this MSL version
-            version_dir = self.output_dir / f"msl_{msl_version.lower()}"
-            version_dir.mkdir(exist_ok=True)
-            
             # Convert each species
-            for idx, row in df.iterrows():
+            bytes_written = 0
+            render_start = time.perf_counter()
+            directory_paths = self.create_directory_paths(df)
+            for idx, row, species_dir in zip(df.index, df.to_dict('records'), directory_paths):
                 try:
                     species_record, safe_name = self.create_species_yaml(row, msl_version)
+                    yaml_bytes = _format_species_yaml(species_record['scientific_name'],
+                                                      species_record['taxonomy'],
+                                                      species_record['metadata'])
                     
-                    # Create directory structure
-                    species_dir_path = self.create_directory_structure(row)
-                    full_species_dir = version_dir / species_dir_path
-                    full_species_dir.mkdir(parents=True, exist_ok=True)
-                    
-                    # Write YAML file
-                    yaml_file = full_species_dir / f"{safe_name}.yaml"
-                    with open(yaml_file, 'w') as f:
-                        yaml.dump(species_record, f, default_flow_style=False, sort_keys=False)
+                    relative_path = (Path(species_dir) / f"{safe_name}.yaml").as_posix()
+                    conversion_result['yaml_files'][relative_path] = yaml_bytes
+                    bytes_written += len(yaml_bytes)
                     
                     conversion_result['species_files_created'] += 1
                     
@@ -359,74 +419,27 @@ class HistoricalMSLConverter:
                     conversion_result['errors'].append(error_msg)
                     print(f"   ⚠️  {error_msg}")
             
+            render_seconds = time.perf_counter() - render_start
+            conversion_result['bytes_written'] = bytes_written
+            
             # Convert sets to lists for JSON serialization
             conversion_result['families'] = list(conversion_result['families'])
             conversion_result['genera'] = list(conversion_result['genera'])
             
             print(f"   ✅ Converted {conversion_result['species_files_created']} species")
             print(f"   📊 Found {len(conversion_result['families'])} families, {len(conversion_result['genera'])} genera")
+            if render_seconds > 0:
+                print(f"   💾 Rendered {bytes_written / 1024 / 1024:.1f} MB "
+                      f"({bytes_written / 1024 / 1024 / render_seconds:.1f} MB/s)")
             
             return conversion_result
             
         except Exception as e:
             return {'error': f'Failed to convert {msl_version}: {e}'}
     
-    def create_git_repository(self, repo_path: Path):
-        """Initialize git repository and create commits for each MSL version"""
-        print(f"\n📁 Creating git repository at {repo_path}")
-        
-        # Initialize git repository
-        if repo_path.exists():
-            shutil.rmtree(repo_path)
-        
-        repo_path.mkdir(parents=True)
-        repo = git.Repo.init(repo_path)
-        
-        # Configure git
-        with repo.config_writer() as git_config:
-            git_config.set_value('user', 'name', 'ICTV Historical Converter')
-            git_config.set_value('user', 'email', 'ictv-git@taxonomy.org')
-        
-        conversion_summary = {
-            'repository_path': str(repo_path),
-            'total_msl_versions': len(self.msl_files),
-            'commits_created': 0,
-            'total_species_across_versions': 0,
-            'conversion_timeline': []
-        }
-        
-        # Process each MSL version in chronological order
-        for msl_version in sorted(self.msl_files.keys(), key=lambda x: self.msl_files[x]['year']):
-            print(f"\n🏷️  Processing {msl_version} ({self.msl_files[msl_version]['year']})")
-            
-            # Convert MSL to YAML
-            conversion_result = self.convert_msl_to_yaml(msl_version)
-            
-            if 'error' in conversion_result:
-                print(f"   ❌ Failed: {conversion_result['error']}")
-                continue
-            
-            # Copy converted files to git repository
-            source_dir = self.output_dir / f"msl_{msl_version.lower()}"
-            
-            if source_dir.exists():
-                # Clear repository for this version
-                for item in repo_path.iterdir():
-                    if item.name != '.git':
-                        if item.is_dir():
-                            shutil.rmtree(item)
-                        else:
-                            item.unlink()
-                
-                # Copy new structure
-                for item in source_dir.iterdir():
-                    if item.is_dir():
-                        shutil.copytree(item, repo_path / item.name)
-                    else:
-                        shutil.copy2(item, repo_path)
-                
-                # Create README for this version
-                readme_content = f"""# ICTV {msl_version} - {self.msl_files[msl_version]['description']}
+    def create_readme(self, msl_version: str, conversion_result: Dict[str, Any]) -> str:
+        """Create README content for an MSL version commit"""
+        return f"""# ICTV {msl_version} - {self.msl_files[msl_version]['description']}
 
 Released: {self.msl_files[msl_version]['date']}
 Species count: {conversion_result['species_files_created']}
@@ -463,13 +476,66 @@ realms/
 │                                                       └── [species].yaml
 ```
 """
+    
+    def create_git_repository(self, repo_path: Path):
+        """Initialize git repository and create commits for each MSL version
+        
+        Commits are streamed straight into the object database with
+        git fast-import, so the per-version trees never touch the working tree.
+        """
+        # fast-import runs inside the repository, so every path handed to it must be absolute
+        repo_path = Path(repo_path).resolve()
+        print(f"\n📁 Creating git repository at {repo_path}")
+        
+        # Initialize git repository
+        if repo_path.exists():
+            shutil.rmtree(repo_path)
+        
+        repo_path.mkdir(parents=True)
+        repo = git.Repo.init(repo_path)
+        repo.git.symbolic_ref('HEAD', 'refs/heads/main')
+        
+        # Configure git
+        with repo.config_writer() as git_config:
+            git_config.set_value('user', 'name', 'ICTV Historical Converter')
+            git_config.set_value('user', 'email', 'ictv-git@taxonomy.org')
+        
+        conversion_summary = {
+            'repository_path': str(repo_path),
+            'total_msl_versions': len(self.msl_files),
+            'commits_created': 0,
+            'total_species_across_versions': 0,
+            'conversion_timeline': []
+        }
+        
+        identity = b'ICTV Historical Converter <ictv-git@taxonomy.org>'
+        marks_file = repo_path / '.git' / 'fast-import-marks'
+        fast_import = subprocess.Popen(
+            ['git', 'fast-import', '--quiet', '--date-format=raw', f'--export-marks={marks_file}'],
+            stdin=subprocess.PIPE, cwd=repo_path
+        )
+        stream = fast_import.stdin
+        
+        def write_data(data: bytes):
+            stream.write(b'data %d\n' % len(data))
+            stream.write(data)
+            stream.write(b'\n')
+        
+        try:
+            # Process each MSL version in chronological order
+            for mark, msl_version in enumerate(
+                    sorted(self.msl_files.keys(), key=lambda x: self.msl_files[x]['year']), start=1):
+                print(f"\n🏷️  Processing {msl_version} ({self.msl_files[msl_version]['year']})")
                 
-                readme_path = repo_path / "README.md"
-                with open(readme_path, 'w') as f:
-                    f.write(readme_content)
+                # Convert MSL to YAML
+                conversion_result = self.convert_msl_to_yaml(msl_version)
                 
-                # Stage all files
-                repo.git.add(A=True)
+                if 'error' in conversion_result:
+                    print(f"   ❌ Failed: {conversion_result['error']}")
+                    continue
+                
+                yaml_files = conversion_result.pop('yaml_files')
+                readme_content = self.create_readme(msl_version, conversion_result)
                 
                 # Create commit with proper date
                 commit_date = self.msl_files[msl_version]['date']
@@ -482,37 +548,70 @@ Genera: {len(conversion_result['genera'])}
 Release date: {commit_date}
 Source: {self.msl_files[msl_version]['file']}
 """
+                timestamp = int(datetime.strptime(commit_date, '%Y-%m-%d')
+                                .replace(tzinfo=timezone.utc).timestamp())
+                signature = b'%s %d +0000\n' % (identity, timestamp)
                 
-                try:
-                    # Commit with historical date
-                    commit = repo.index.commit(
-                        commit_message,
-                        commit_date=commit_date,
-                        author_date=commit_date
-                    )
-                    
-                    # Tag the commit
-                    repo.create_tag(msl_version, commit, message=f"ICTV {msl_version} Release")
-                    
-                    conversion_summary['commits_created'] += 1
-                    conversion_summary['total_species_across_versions'] += conversion_result['species_files_created']
-                    
-                    conversion_summary['conversion_timeline'].append({
-                        'msl_version': msl_version,
-                        'commit_sha': commit.hexsha,
-                        'date': commit_date,
-                        'species_count': conversion_result['species_files_created'],
-                        'families_count': len(conversion_result['families']),
-                        'genera_count': len(conversion_result['genera'])
-                    })
-                    
-                    print(f"   ✅ Created commit {commit.hexsha[:8]} for {msl_version}")
-                    
-                except Exception as e:
-                    print(f"   ❌ Failed to commit {msl_version}: {e}")
+                # Each commit replaces the whole tree with this version's files
+                stream.write(b'commit refs/heads/main\nmark :%d\n' % mark)
+                stream.write(b'author ' + signature + b'committer ' + signature)
+                write_data(commit_message.encode('utf-8'))
+                stream.write(b'deleteall\n')
+                for relative_path, yaml_bytes in yaml_files.items():
+                    stream.write(b'M 100644 inline ' + relative_path.encode('utf-8') + b'\n')
+                    write_data(yaml_bytes)
+                stream.write(b'M 100644 inline README.md\n')
+                write_data(readme_content.encode('utf-8'))
+                stream.write(b'\n')
+                
+                # Tag the commit
+                stream.write(b'tag %s\nfrom :%d\n' % (msl_version.encode(), mark))
+                stream.write(b'tagger ' + signature)
+                write_data(f"ICTV {msl_version} Release".encode('utf-8'))
+                
+                conversion_summary['conversion_timeline'].append({
+                    'msl_version': msl_version,
+                    'mark': mark,
+                    'date': commit_date,
+                    'species_count': conversion_result['species_files_created'],
+                    'families_count': len(conversion_result['families']),
+                    'genera_count': len(conversion_result['genera'])
+                })
             
-            else:
-                print(f"   ⚠️  No converted data found for {msl_version}")
+            stream.close()
+        except BrokenPipeError:
+            pass
+        except BaseException:
+            # Don't leave fast-import blocked on a half-written stream
+            fast_import.kill()
+            try:
+                stream.close()
+            except OSError:
+                pass
+            fast_import.wait()
+            raise
+        
+        if fast_import.wait() != 0:
+            print(f"   ❌ git fast-import failed with exit code {fast_import.returncode}")
+            conversion_summary['conversion_timeline'] = []
+            return conversion_summary
+        
+        # Resolve fast-import marks to commit SHAs
+        commit_shas = {}
+        for line in marks_file.read_text().splitlines():
+            mark, sha = line.split()
+            commit_shas[int(mark.lstrip(':'))] = sha
+        marks_file.unlink()
+        
+        for entry in conversion_summary['conversion_timeline']:
+            entry['commit_sha'] = commit_shas[entry.pop('mark')]
+            conversion_summary['commits_created'] += 1
+            conversion_summary['total_species_across_versions'] += entry['species_count']
+            print(f"   ✅ Created commit {entry['commit_sha'][:8]} for {entry['msl_version']}")
+        
+        # Populate the working tree with the latest version
+        if conversion_summary['commits_created']:
+            repo.git.reset('--hard')
         
         return conversion_summary
     
@@ -558,40 +657,69 @@ Source: {self.msl_files[msl_version]['file']}
         except Exception as e:
             return {'error': f'Failed to analyze historical changes: {e}'}
     
+    def build_msl_manifest(self) -> Dict[str, List[int]]:
+        """Fingerprint MSL source files by modification time and size"""
+        manifest = {}
+        for msl_version, info in self.msl_files.items():
+            file_path = self.data_dir / 'raw' / info['file']
+            if file_path.exists():
+                stat = file_path.stat()
+                manifest[msl_version] = [stat.st_mtime_ns, stat.st_size]
+        return manifest
+    
     def run_complete_conversion(self):
         """Run the complete historical conversion process"""
         print("🚀 ICTV Historical Git Conversion - Complete Timeline")
         print("=" * 60)
         
-        # Step 1: Analyze all MSL files
-        print("\n📊 Step 1: Analyzing MSL file structures...")
-        
-        analysis_results = {}
-        for msl_version in self.msl_files.keys():
-            analysis = self.analyze_msl_structure(msl_version)
-            analysis_results[msl_version] = analysis
-            
-            if 'error' not in analysis:
-                print(f"   ✅ {msl_version}: {analysis['row_counts']} rows, {len(analysis['sheets'])} sheets")
-            else:
-                print(f"   ❌ {msl_version}: {analysis['error']}")
-        
-        # Save analysis
-        analysis_file = self.output_dir / "msl_structure_analysis.json"
-        with open(analysis_file, 'w') as f:
-            json.dump(analysis_results, f, indent=2, default=str)
-        print(f"   💾 Saved analysis to {analysis_file}")
-        
-        # Step 2: Create git repository with historical timeline
-        print(f"\n🏗️  Step 2: Creating historical git repository...")
-        
         git_repo_path = self.output_dir / "ictv_complete_taxonomy"
-        conversion_summary = self.create_git_repository(git_repo_path)
-        
-        # Save conversion summary
+        analysis_file = self.output_dir / "msl_structure_analysis.json"
         summary_file = self.output_dir / "historical_conversion_summary.json"
-        with open(summary_file, 'w') as f:
-            json.dump(conversion_summary, f, indent=2, default=str)
+        manifest_file = self.output_dir / ".msl_manifest.json"
+        
+        # Reuse the previous repository when no MSL file changed since the last run
+        manifest = self.build_msl_manifest()
+        previous_manifest = None
+        if manifest_file.exists():
+            with open(manifest_file) as f:
+                previous_manifest = json.load(f)
+        
+        if previous_manifest == manifest and git_repo_path.exists() and summary_file.exists():
+            print("\n⏭️  MSL files unchanged since last run, reusing existing repository")
+            with open(summary_file) as f:
+                conversion_summary = json.load(f)
+        else:
+            # Step 1: Analyze all MSL files
+            print("\n📊 Step 1: Analyzing MSL file structures...")
+            
+            analysis_results = {}
+            for msl_version in self.msl_files.keys():
+                analysis = self.analyze_msl_structure(msl_version)
+                analysis_results[msl_version] = analysis
+                
+                if 'error' not in analysis:
+                    print(f"   ✅ {msl_version}: {analysis['row_counts']} rows, {len(analysis['sheets'])} sheets")
+                else:
+                    print(f"   ❌ {msl_version}: {analysis['error']}")
+            
+            # Save analysis
+            with open(analysis_file, 'w') as f:
+                json.dump(analysis_results, f, indent=2, default=str)
+            print(f"   💾 Saved analysis to {analysis_file}")
+            
+            # Step 2: Create git repository with historical timeline
+            print(f"\n🏗️  Step 2: Creating historical git repository...")
+            
+            conversion_summary = self.create_git_repository(git_repo_path)
+            
+            # Save conversion summary
+            with open(summary_file, 'w') as f:
+                json.dump(conversion_summary, f, indent=2, default=str)
+            
+            # Record the inputs this repository was built from
+            if conversion_summary['commits_created']:
+                with open(manifest_file, 'w') as f:
+                    json.dump(manifest, f, indent=2)
         
         # Step 3: Analyze historical changes
         print(f"\n🔍 Step 3: Analyzing historical taxonomy evolution...")
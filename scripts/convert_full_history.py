@@ -10,14 +10,21 @@ import sys
 import os
 from pathlib import Path
 import logging
-import shutil
 import re
+import json
+import hashlib
+import yaml
+import git
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from tqdm import tqdm
+from tqdm.contrib.logging import logging_redirect_tqdm
 
 # Add src to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.converters.msl_to_git import MSLToGitConverter
-from src.parsers.msl_parser import MSLParser
+from src.converters.msl_to_git import MSLToGitConverter, fast_reset
+from src.parsers.msl_parser import load_species_cached
 
 # Set up logging
 logging.basicConfig(
@@ -26,33 +33,90 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Version number and release year embedded in MSL filenames
+_MSL_VER_RE = re.compile(r'MSL(\d+)')
+_YEAR_RE = re.compile(r'(\d{4})')
+
+# Consolidate the per-version fast-import packs after this many commits
+REPACK_EVERY = 4
+
+# Content hashes of the MSL files behind each committed version
+MANIFEST_NAME = '.conversion_manifest.json'
+
+
+def _file_digest(file_path: Path) -> str:
+    """Content hash of an MSL file, as recorded in the conversion manifest."""
+    return hashlib.blake2b(file_path.read_bytes(), digest_size=16).hexdigest()
+
+
+def _reusable_versions(output_dir: Path, msl_files: list, digests: dict) -> list:
+    """
+    Find the leading MSL versions whose existing commits can be kept.
+    
+    History is linear, so once one file has changed (or was never committed)
+    every later version has to be rebuilt on top of the last unchanged one.
+    """
+    manifest_path = output_dir / MANIFEST_NAME
+    if not manifest_path.exists() or not (output_dir / '.git').exists():
+        return []
+    
+    manifest = json.loads(manifest_path.read_text())
+    tags = {tag.name for tag in git.Repo(output_dir).tags}
+    
+    reusable = []
+    for msl_info in msl_files:
+        version_name = msl_info['version_name']
+        if manifest.get(version_name) != digests[version_name] or version_name.lower() not in tags:
+            break
+        reusable.append(msl_info)
+    
+    return reusable
+
+
+def _kept_version_stats(converter: MSLToGitConverter, msl_info: dict) -> dict:
+    """Rebuild a conversion_stats entry from a kept version's metadata file."""
+    tag = msl_info['version_name'].lower()
+    metadata = yaml.safe_load(converter.repo.git.show(f'{tag}:metadata/{tag}_stats.yaml'))
+    
+    return {
+        'version': msl_info['version_name'],
+        'year': msl_info['year'],
+        'filename': msl_info['filename'],
+        'species_count': metadata['species_count'],
+        'families': metadata['statistics']['families'],
+        'genera': metadata['statistics']['genera'],
+        'success': True
+    }
+
 
 def get_available_msl_files(data_dir: Path) -> list:
     """Get all available MSL files sorted by version number."""
     
-    # Find all MSL files (.xls and .xlsx)
-    msl_files = []
-    msl_files.extend(data_dir.glob("MSL*_*.xls"))
-    msl_files.extend(data_dir.glob("MSL*_*.xlsx"))
-    
-    # Extract version numbers and sort
+    # Find all MSL files (.xls and .xlsx) in a single directory scan,
+    # taking sizes from the scan entries as we go
     version_files = []
-    for file_path in msl_files:
-        # Extract MSL version number (e.g., MSL23, MSL36)
-        match = re.search(r'MSL(\d+)', file_path.name)
-        if match:
-            version_num = int(match.group(1))
-            # Extract year from filename
-            year_match = re.search(r'(\d{4})', file_path.name)
-            year = int(year_match.group(1)) if year_match else None
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if not (name.endswith(('.xls', '.xlsx')) and name.startswith('MSL') and '_' in name):
+                continue
             
-            version_files.append({
-                'version_num': version_num,
-                'version_name': f'MSL{version_num}',
-                'year': year,
-                'file_path': file_path,
-                'filename': file_path.name
-            })
+            # Extract MSL version number (e.g., MSL23, MSL36)
+            match = _MSL_VER_RE.search(name)
+            if match:
+                version_num = int(match.group(1))
+                # Extract year from filename
+                year_match = _YEAR_RE.search(name)
+                year = int(year_match.group(1)) if year_match else None
+                
+                version_files.append({
+                    'version_num': version_num,
+                    'version_name': f'MSL{version_num}',
+                    'year': year,
+                    'file_path': Path(entry.path),
+                    'filename': name,
+                    'file_size_kb': entry.stat().st_size / 1024
+                })
     
     # Sort by version number
     version_files.sort(key=lambda x: x['version_num'])
@@ -60,8 +124,20 @@ def get_available_msl_files(data_dir: Path) -> list:
     return version_files
 
 
-def convert_complete_history():
-    """Convert all available MSL files to show complete taxonomy evolution."""
+def _parse_version(file_path: Path, use_cache: bool) -> tuple:
+    """Parse one MSL file into species and summary stats (runs in a worker process)."""
+    # Per-step parser logging from workers would break up the parent's progress bar
+    logging.getLogger('src.parsers.msl_parser').setLevel(logging.WARNING)
+    return load_species_cached(str(file_path), use_cache=use_cache)
+
+
+def convert_complete_history(use_cache: bool = True, use_processes: bool = True):
+    """
+    Convert all available MSL files to show complete taxonomy evolution.
+    
+    With use_processes=False, a single background thread parses the next
+    version while the main thread streams the previous one into git.
+    """
     
     data_dir = Path(__file__).parent.parent / 'data' / 'raw'
     output_dir = Path(__file__).parent.parent / 'output' / 'viral-taxonomy-complete-history'
@@ -73,82 +149,129 @@ def convert_complete_history():
         logger.error("No MSL files found. Please run download_msl.py first.")
         return False
     
+    # Each version becomes one commit and tag, and parses are tracked by version name
+    files_by_version = {}
+    for msl_info in msl_files:
+        files_by_version.setdefault(msl_info['version_name'], []).append(msl_info['filename'])
+    duplicates = {version: names for version, names in files_by_version.items() if len(names) > 1}
+    if duplicates:
+        for version, names in duplicates.items():
+            logger.error(f"Several files resolve to {version}: {', '.join(names)}")
+        logger.error("Keep one file per MSL version in data/raw and rerun.")
+        return False
+    
     print("\n" + "="*80)
     print("COMPLETE ICTV TAXONOMY HISTORY CONVERSION")
     print("="*80)
     print(f"Found {len(msl_files)} MSL files:")
     for msl_info in msl_files:
-        file_size = msl_info['file_path'].stat().st_size / 1024  # KB
-        print(f"  - {msl_info['version_name']} ({msl_info['year']}): {msl_info['filename']} ({file_size:.0f} KB)")
+        print(f"  - {msl_info['version_name']} ({msl_info['year']}): {msl_info['filename']} ({msl_info['file_size_kb']:.0f} KB)")
     
-    # Clean output directory if it exists
-    if output_dir.exists():
-        logger.info(f"Cleaning existing output directory: {output_dir}")
-        shutil.rmtree(output_dir)
+    digests = {msl_info['version_name']: _file_digest(msl_info['file_path']) for msl_info in msl_files}
+    kept_versions = _reusable_versions(output_dir, msl_files, digests)
     
-    # Create converter
-    logger.info(f"Creating git repository at: {output_dir}")
-    converter = MSLToGitConverter(str(output_dir), initialize=True)
+    if kept_versions:
+        converter = MSLToGitConverter(str(output_dir), initialize=True)
+        last_kept = kept_versions[-1]['version_name'].lower()
+        last_kept_commit = converter.repo.tags[last_kept].commit
+        
+        if len(kept_versions) == len(msl_files) and converter.repo.head.commit == last_kept_commit:
+            print(f"\nAll {len(msl_files)} MSL versions are unchanged since the last conversion.")
+            print(f"Repository is up to date: {output_dir}")
+            return True
+        
+        # Drop the commits and tags of every version after the last unchanged one
+        logger.info(f"Keeping {len(kept_versions)} unchanged versions (through {last_kept})")
+        converter.repo.git.reset('--hard', last_kept_commit.hexsha)
+        kept_tags = {msl_info['version_name'].lower() for msl_info in kept_versions}
+        for tag in converter.repo.tags:
+            if re.fullmatch(r'msl\d+', tag.name) and tag.name not in kept_tags:
+                converter.repo.delete_tag(tag)
+        
+        # Track conversion statistics
+        conversion_stats = [_kept_version_stats(converter, msl_info) for msl_info in kept_versions]
+    else:
+        # Clean output directory if it exists
+        if output_dir.exists():
+            logger.info(f"Cleaning existing output directory: {output_dir}")
+            fast_reset(output_dir)
+        
+        # Create converter
+        logger.info(f"Creating git repository at: {output_dir}")
+        converter = MSLToGitConverter(str(output_dir), initialize=True)
+        converter.repo.git.config('gc.auto', '6700')
+        converter.repo.git.config('core.compression', '1')
+        
+        # Track conversion statistics
+        conversion_stats = []
     
-    # Track conversion statistics
-    conversion_stats = []
+    remaining_files = msl_files[len(kept_versions):]
     
-    # Convert each version in chronological order
-    for i, msl_info in enumerate(msl_files):
-        version_name = msl_info['version_name']
-        file_path = msl_info['file_path']
-        year = msl_info['year']
+    # Parse versions ahead of the committer; commits must stay in chronological order
+    workers = os.cpu_count() if use_processes else 1
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=workers) as pool, logging_redirect_tqdm():
+        futures = {}
+        upcoming = iter(remaining_files)
         
-        print(f"\n{'-'*60}")
-        print(f"Converting {version_name} ({year}): {file_path.name}")
-        print(f"Progress: {i+1}/{len(msl_files)}")
-        print(f"{'-'*60}")
+        def submit_ahead():
+            # Keep at most one parsed version per worker (plus one) waiting in memory
+            for msl_info in islice(upcoming, workers + 1 - len(futures)):
+                futures[msl_info['version_name']] = pool.submit(
+                    _parse_version, msl_info['file_path'], use_cache
+                )
         
-        try:
-            # Parse file first to get basic stats
-            parser = MSLParser(str(file_path))
-            parser.load_file()
-            parser.parse_sheet()
-            species_list = parser.extract_species()
-            
-            # Convert to git
-            species_count = converter.convert_msl_file(str(file_path), version_name.lower())
-            
-            # Get taxonomy stats
-            stats = converter.get_taxonomy_stats()
-            
-            conversion_info = {
-                'version': version_name,
-                'year': year,
-                'filename': file_path.name,
-                'species_count': species_count,
-                'families': len(stats['families']),
-                'genera': len(stats['genera']),
-                'success': True
-            }
-            
-            print(f"  ✓ Successfully converted {species_count:,} species")
-            print(f"    - Families: {len(stats['families']):,}")
-            print(f"    - Genera: {len(stats['genera']):,}")
-            
-            # Show growth compared to previous version
-            if conversion_stats:
-                prev_stats = conversion_stats[-1]
-                species_growth = species_count - prev_stats['species_count']
-                families_growth = len(stats['families']) - prev_stats['families']
-                print(f"    - Growth: +{species_growth:,} species, +{families_growth:,} families")
-            
-            conversion_stats.append(conversion_info)
+        submit_ahead()
+        
+        # Stream each version into git in chronological order as its parse completes
+        progress = tqdm(remaining_files, desc='Converting MSL', unit='ver',
+                        initial=len(kept_versions), total=len(msl_files))
+        for msl_info in progress:
+            version_name = msl_info['version_name']
+            file_path = msl_info['file_path']
+            year = msl_info['year']
             
-        except Exception as e:
-            logger.error(f"  ✗ Failed to convert {version_name}: {e}")
-            conversion_stats.append({
-                'version': version_name,
-                'year': year,
-                'filename': file_path.name,
-                'error': str(e),
-                'success': False
-            })
+            try:
+                future = futures.pop(version_name)
+                submit_ahead()
+                species_list, stats = future.result()
+                
+                # Convert to git
+                species_count = converter.convert_via_fast_import(
+                    species_list, version_name.lower(), file_path.name, stats
+                )
+                
+                conversion_info = {
+                    'version': version_name,
+                    'year': year,
+                    'filename': file_path.name,
+                    'species_count': species_count,
+                    'families': stats['families'],
+                    'genera': stats['genera'],
+                    'success': True
+                }
+                
+                progress.set_postfix({'version': version_name, 'species': species_count})
+                conversion_stats.append(conversion_info)
+                
+                commits = sum(1 for info in conversion_stats if info.get('success', False))
+                if commits % REPACK_EVERY == 0:
+                    converter.repo.git.repack('-a', '-d', '--depth=250', '--window=250')
+                
+            except Exception as e:
+                logger.error(f"  ✗ Failed to convert {version_name}: {e}")
+                conversion_stats.append({
+                    'version': version_name,
+                    'year': year,
+                    'filename': file_path.name,
+                    'error': str(e),
+                    'success': False
+                })
+    
+    # Materialize the latest version once all commits are in
+    converter.checkout_working_tree()
+    converter.repo.git.repack('-a', '-d', '--depth=250', '--window=250')
+    converter.repo.git.gc('--prune=now')
     
     # Final summary
     print("\n" + "="*80)
@@ -163,6 +286,20 @@ def convert_complete_history():
     print(f"Successful: {len(successful)}")
     print(f"Failed: {len(failed)}")
     
+    if successful:
+        print(f"\nVersion details:")
+        prev_stats = None
+        for stats in successful:
+            line = (f"  - {stats['version']} ({stats['year']}): {stats['species_count']:,} species, "
+                    f"{stats['families']:,} families, {stats['genera']:,} genera")
+            # Show growth compared to previous version
+            if prev_stats:
+                species_growth = stats['species_count'] - prev_stats['species_count']
+                families_growth = stats['families'] - prev_stats['families']
+                line += f" (+{species_growth:,} species, +{families_growth:,} families)"
+            print(line)
+            prev_stats = stats
+    
     if successful:
         print(f"\n20-Year Taxonomy Evolution ({successful[0]['year']}-{successful[-1]['year']}):")
         print(f"  First version: {successful[0]['version']} ({successful[0]['species_count']:,} species)")
@@ -190,35 +327,41 @@ def convert_complete_history():
     
     # Create summary report
     report_path = output_dir / 'CONVERSION_REPORT.md'
-    with open(report_path, 'w') as f:
-        f.write("# Complete ICTV Taxonomy History Conversion Report\n\n")
-        f.write(f"Generated: {Path(__file__).name}\n\n")
-        f.write("## Conversion Summary\n\n")
-        f.write(f"- Total MSL versions processed: {len(conversion_stats)}\n")
-        f.write(f"- Successful conversions: {len(successful)}\n")
-        f.write(f"- Failed conversions: {len(failed)}\n")
-        f.write(f"- Time span: {successful[0]['year']}-{successful[-1]['year']} ({years_span} years)\n")
-        f.write(f"- Species growth: {successful[0]['species_count']:,} → {successful[-1]['species_count']:,} (+{total_growth:,})\n\n")
-        
-        f.write("## Version Details\n\n")
-        f.write("| Version | Year | Species | Families | Genera | Status |\n")
-        f.write("|---------|------|---------|----------|--------|--------|\n")
-        for stats in conversion_stats:
-            if stats.get('success', False):
-                f.write(f"| {stats['version']} | {stats['year']} | {stats['species_count']:,} | {stats['families']:,} | {stats['genera']:,} | ✓ |\n")
-            else:
-                f.write(f"| {stats['version']} | {stats['year']} | - | - | - | ✗ |\n")
-        
-        f.write(f"\n## Git Repository Usage\n\n")
-        f.write(f"```bash\n")
-        f.write(f"cd {output_dir}\n")
-        f.write(f"git log --oneline  # See chronological changes\n")
-        f.write(f"git diff msl23 msl40 --stat  # 20-year overview\n")
-        f.write(f"git show msl36  # Examine specific version\n")
-        f.write(f"```\n")
+    version_rows = ''.join(
+        f"| {stats['version']} | {stats['year']} | {stats['species_count']:,} | {stats['families']:,} | {stats['genera']:,} | ✓ |\n"
+        if stats.get('success', False) else
+        f"| {stats['version']} | {stats['year']} | - | - | - | ✗ |\n"
+        for stats in conversion_stats
+    )
+    report = (
+        "# Complete ICTV Taxonomy History Conversion Report\n\n"
+        f"Generated: {Path(__file__).name}\n\n"
+        "## Conversion Summary\n\n"
+        f"- Total MSL versions processed: {len(conversion_stats)}\n"
+        f"- Successful conversions: {len(successful)}\n"
+        f"- Failed conversions: {len(failed)}\n"
+        f"- Time span: {successful[0]['year']}-{successful[-1]['year']} ({years_span} years)\n"
+        f"- Species growth: {successful[0]['species_count']:,} → {successful[-1]['species_count']:,} (+{total_growth:,})\n\n"
+        "## Version Details\n\n"
+        "| Version | Year | Species | Families | Genera | Status |\n"
+        "|---------|------|---------|----------|--------|--------|\n"
+        f"{version_rows}"
+        "\n## Git Repository Usage\n\n"
+        "```bash\n"
+        f"cd {output_dir}\n"
+        "git log --oneline  # See chronological changes\n"
+        "git diff msl23 msl40 --stat  # 20-year overview\n"
+        "git show msl36  # Examine specific version\n"
+        "```\n"
+    )
+    report_path.write_text(report)
     
     logger.info(f"Conversion report saved to: {report_path}")
     
+    # Record which file contents the committed versions were built from
+    manifest = {stats['version']: digests[stats['version']] for stats in successful}
+    (output_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+    
     return len(failed) == 0
 
 
@@ -229,10 +372,15 @@ def main():
     parser = argparse.ArgumentParser(description='Convert complete MSL history to git repository')
     parser.add_argument('--output', type=str,
                        help='Output directory for repository (default: output/viral-taxonomy-complete-history)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Re-parse every MSL file instead of using the data/cache species cache')
+    parser.add_argument('--threads', action='store_true',
+                       help='Parse in a background thread instead of worker processes')
     
     args = parser.parse_args()
     
-    success = convert_complete_history()
+    success = convert_complete_history(use_cache=not args.no_cache,
+                                       use_processes=not args.threads)
     sys.exit(0 if success else 1)
 
 
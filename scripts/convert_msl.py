@@ -10,13 +10,11 @@ import sys
 import os
 from pathlib import Path
 import logging
-import shutil
 
 # Add src to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.converters.msl_to_git import MSLToGitConverter
-from src.parsers.msl_parser import MSLParser
+from src.converters.msl_to_git import MSLToGitConverter, fast_reset
 
 # Set up logging
 logging.basicConfig(
@@ -26,7 +24,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def convert_msl36_demo():
+def convert_msl36_demo(use_cache: bool = True):
     """Convert MSL36 as a demonstration."""
     
     # Paths
@@ -45,7 +43,7 @@ def convert_msl36_demo():
     # Clean output directory if it exists
     if output_dir.exists():
         logger.info(f"Cleaning existing output directory: {output_dir}")
-        shutil.rmtree(output_dir)
+        fast_reset(output_dir)
     
     # Create converter
     logger.info(f"Creating git repository at: {output_dir}")
@@ -53,10 +51,10 @@ def convert_msl36_demo():
     
     # Convert MSL36
     logger.info("Converting MSL36 to git structure...")
-    species_count = converter.convert_msl_file(str(msl_file), 'MSL36')
+    species_count = converter.convert_msl_file(str(msl_file), 'MSL36', use_cache=use_cache)
     
-    # Get statistics
-    stats = converter.get_taxonomy_stats()
+    # Get statistics; the repository was just cleared, so MSL36 is all it holds
+    stats = converter.get_taxonomy_stats(incremental=True)
     
     print("\n" + "="*60)
     print("MSL36 CONVERSION COMPLETE")
@@ -95,7 +93,7 @@ def convert_msl36_demo():
     return True
 
 
-def convert_multiple_versions():
+def convert_multiple_versions(use_cache: bool = True):
     """Convert multiple MSL versions to show evolution."""
     
     data_dir = Path(__file__).parent.parent / 'data' / 'raw'
@@ -107,7 +105,7 @@ def convert_multiple_versions():
     # Clean output directory if it exists
     if output_dir.exists():
         logger.info(f"Cleaning existing output directory: {output_dir}")
-        shutil.rmtree(output_dir)
+        fast_reset(output_dir)
     
     # Create converter
     logger.info(f"Creating git repository at: {output_dir}")
@@ -125,7 +123,7 @@ def convert_multiple_versions():
         logger.info(f"\nConverting {version} from {msl_file.name}")
         
         try:
-            species_count = converter.convert_msl_file(str(msl_file), version)
+            species_count = converter.convert_msl_file(str(msl_file), version, use_cache=use_cache)
             logger.info(f"  Successfully converted {species_count} species")
         except Exception as e:
             logger.error(f"  Failed to convert {version}: {e}")
@@ -156,13 +154,15 @@ def main():
                        help='Output directory for repository')
     parser.add_argument('--version', type=str,
                        help='MSL version (e.g., MSL36)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Re-parse MSL files instead of using the data/cache species cache')
     
     args = parser.parse_args()
     
     if args.demo:
-        success = convert_msl36_demo()
+        success = convert_msl36_demo(use_cache=not args.no_cache)
     elif args.evolution:
-        success = convert_multiple_versions()
+        success = convert_multiple_versions(use_cache=not args.no_cache)
     elif args.file and args.output and args.version:
         from src.converters.msl_to_git import convert_single_msl
         convert_single_msl(args.file, args.output, args.version)
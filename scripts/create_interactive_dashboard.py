@@ -5,14 +5,56 @@ Create interactive HTML dashboard for ICTV-git data using Plotly.
 This creates a standalone HTML file that can be opened in any browser.
 """
 
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import plotly.express as px
-from pathlib import Path
+import hashlib
 import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Cached page skeletons for write_figure_html()
+TEMPLATE_DIR = Path(__file__).parent.parent / "output" / "visualizations" / ".tmpl"
+
+def write_figure_html(fig, output_file, rebuild_template=False, **html_kwargs):
+    """
+    Write a figure as standalone HTML, reusing a cached page skeleton.
+    
+    The first run renders the page with Plotly and keeps a copy with the
+    figure data and layout swapped for tokens. Later runs only serialize the
+    figure JSON into that skeleton.
+    """
+    import plotly
+    from plotly.io.json import to_json_plotly
+    
+    output_file = Path(output_file)
+    fig_dict = fig.to_plotly_json()
+    data_json = to_json_plotly(fig_dict.get("data", []))
+    layout_json = to_json_plotly(fig_dict.get("layout", {}))
+    # The skeleton depends on the to_html() options, so they are part of its name
+    options_key = hashlib.blake2b(
+        json.dumps(html_kwargs, sort_keys=True, default=repr).encode("utf-8"), digest_size=6
+    ).hexdigest()
+    template_path = TEMPLATE_DIR / f"{output_file.stem}-plotly{plotly.__version__}-{options_key}.html"
+    
+    if rebuild_template or not template_path.exists():
+        html = fig.to_html(full_html=True, div_id=output_file.stem, **html_kwargs)
+        if data_json in html and layout_json in html:
+            template = html.replace(data_json, "{{FIGURE_DATA}}", 1).replace(layout_json, "{{FIGURE_LAYOUT}}", 1)
+            template_path.parent.mkdir(parents=True, exist_ok=True)
+            # Skeletons from other plotly versions or options would never be read again
+            for stale in template_path.parent.glob(f"{output_file.stem}-plotly*.html"):
+                if stale != template_path:
+                    stale.unlink(missing_ok=True)
+            template_path.write_text(template, encoding="utf-8")
+    else:
+        template = template_path.read_text(encoding="utf-8")
+        html = template.replace("{{FIGURE_LAYOUT}}", layout_json, 1).replace("{{FIGURE_DATA}}", data_json, 1)
+    
+    output_file.write_text(html, encoding="utf-8")
 
-def create_interactive_dashboard():
+def create_interactive_dashboard(rebuild_template=False):
     """Create interactive Plotly dashboard."""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
     
     # Timeline data for all MSL releases
     msl_data = [
@@ -49,8 +91,10 @@ def create_interactive_dashboard():
     )
     
     # Extract data
-    years = [d["year"] for d in msl_data]
-    species_counts = [d["species"] for d in msl_data]
+    arr_years = np.fromiter((d["year"] for d in msl_data), dtype=np.int32, count=len(msl_data))
+    arr_species = np.fromiter((d["species"] for d in msl_data), dtype=np.int64, count=len(msl_data))
+    years = arr_years.tolist()
+    species_counts = arr_species.tolist()
     versions = [d["version"] for d in msl_data]
     eras = [d["era"] for d in msl_data]
     
@@ -82,16 +126,12 @@ def create_interactive_dashboard():
                   annotation_text="COVID-19", row=1, col=1)
     
     # 2. Growth by Era (Bar chart)
-    era_data = {}
-    for i, d in enumerate(msl_data):
-        era = d["era"]
-        if era not in era_data:
-            era_data[era] = {"start": i, "end": i, "start_count": d["species"]}
-        era_data[era]["end"] = i
-        era_data[era]["end_count"] = d["species"]
-    
-    era_names = []
-    era_growth = []
+    # Species added per era: last count minus first count, in timeline order
+    era_species = pd.DataFrame(msl_data).groupby('era', sort=False)['species']
+    growth = era_species.last() - era_species.first()
+    era_names = growth.index.str.replace(' Era', '', regex=False).tolist()
+    era_growth = growth.tolist()
+    
     era_colors = {
         "Foundation Era": "#1B4079",
         "Standardization Era": "#2B7489",
@@ -102,11 +142,6 @@ def create_interactive_dashboard():
         "AI Era": "#7D4F9A"
     }
     
-    for era, data in era_data.items():
-        era_names.append(era.replace(" Era", ""))
-        growth = data["end_count"] - data["start_count"]
-        era_growth.append(growth)
-    
     fig.add_trace(
         go.Bar(
             x=era_names, y=era_growth,
@@ -118,12 +153,8 @@ def create_interactive_dashboard():
     )
     
     # 3. Year-over-Year Growth Rate
-    growth_rates = []
-    growth_years = []
-    for i in range(1, len(species_counts)):
-        rate = (species_counts[i] - species_counts[i-1]) / species_counts[i-1] * 100
-        growth_rates.append(rate)
-        growth_years.append(years[i])
+    growth_rates = (np.diff(arr_species) / arr_species[:-1] * 100).tolist()
+    growth_years = arr_years[1:].tolist()
     
     fig.add_trace(
         go.Bar(
@@ -136,8 +167,7 @@ def create_interactive_dashboard():
     )
     
     # 4. Cumulative Growth
-    base_count = species_counts[0]
-    cumulative_growth = [(count - base_count) / base_count * 100 for count in species_counts]
+    cumulative_growth = ((arr_species - arr_species[0]) / arr_species[0] * 100).tolist()
     
     fig.add_trace(
         go.Scatter(
@@ -182,8 +212,9 @@ def create_interactive_dashboard():
     output_dir.mkdir(parents=True, exist_ok=True)
     output_file = output_dir / "ictv_interactive_dashboard.html"
     
-    fig.write_html(
-        output_file,
+    write_figure_html(
+        fig, output_file,
+        rebuild_template=rebuild_template,
         include_plotlyjs='cdn',  # Use CDN for smaller file size
         config={'displayModeBar': True, 'displaylogo': False}
     )
@@ -192,10 +223,11 @@ def create_interactive_dashboard():
     print(f"Open this file in your web browser to explore the data!")
     
     # Also create a species evolution sunburst chart
-    create_sunburst_chart()
+    create_sunburst_chart(rebuild_template)
 
-def create_sunburst_chart():
+def create_sunburst_chart(rebuild_template=False):
     """Create hierarchical sunburst chart showing taxonomy structure."""
+    import plotly.graph_objects as go
     
     # Sample data showing hierarchical structure
     taxonomy_data = [
@@ -243,15 +275,22 @@ def create_sunburst_chart():
     )
     
     output_file = Path("output/visualizations/ictv_taxonomy_sunburst.html")
-    fig.write_html(output_file, include_plotlyjs='cdn')
+    write_figure_html(fig, output_file, rebuild_template=rebuild_template, include_plotlyjs='cdn')
     print(f"Sunburst chart saved to: {output_file}")
 
 def main():
     """Create all interactive visualizations."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Create interactive ICTV dashboards')
+    parser.add_argument('--rebuild-template', action='store_true',
+                       help='Re-render the cached HTML page skeletons with Plotly')
+    args = parser.parse_args()
+    
     print("Creating interactive ICTV dashboards...")
     
     # Create main dashboard
-    create_interactive_dashboard()
+    create_interactive_dashboard(rebuild_template=args.rebuild_template)
     
     print("\n✅ Interactive visualizations created!")
     print("\nTo view the dashboards:")
@@ -5,18 +5,27 @@ Create a sample dataset from full MSL data for testing and demonstration.
 This script extracts a representative subset of species that includes:
 - Different realms
 - Various genome types
-- Multiple host types
 - Diverse taxonomic families
 """
 
 import argparse
+import hashlib
+import os
+import re
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import yaml
 import json
 from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
 import sys
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
@@ -24,65 +33,97 @@ from src.parsers.msl_parser import MSLParser
 from src.converters.msl_to_git import MSLToGitConverter
 
 
+def _sample_stamp(msl_file: str, sample_size: int, output_path: Path) -> Path:
+    """Stamp file marking a sample built from this exact MSL file and size."""
+    source = os.stat(msl_file)
+    key = hashlib.blake2b(
+        f"{source.st_mtime_ns}:{source.st_size}:{sample_size}".encode(),
+        digest_size=8
+    ).hexdigest()
+    return output_path / f'.cache_{key}'
+
+
 def create_sample_dataset(msl_file: str, sample_size: int = 50, 
-                         output_dir: str = "data/sample") -> Dict:
+                         output_dir: str = "data/sample",
+                         use_cache: bool = True) -> Dict:
     """Create a representative sample dataset from an MSL file.
     
     Args:
         msl_file: Path to MSL Excel file
         sample_size: Number of species to include
         output_dir: Directory to save sample data
+        use_cache: Reuse an existing sample built from the same file and size
         
     Returns:
         Dictionary with sample statistics
     """
     print(f"Creating sample dataset from {msl_file}")
     
-    # Parse the MSL file
+    output_path = Path(output_dir)
+    stats_path = output_path / 'sample_statistics.json'
+    stamp_path = _sample_stamp(msl_file, sample_size, output_path)
+    
+    if use_cache and stamp_path.exists() and stats_path.exists():
+        print(f"Sample in {output_dir} is up to date, skipping MSL parse")
+        return json.loads(stats_path.read_text())
+    
+    # Parse the MSL file; the well-known lookup and genome-type counts need
+    # every species, so this cannot be a parse_sample() pool
     parser = MSLParser(msl_file)
-    all_species = parser.parse()
+    parser.load_file()
+    parser.parse_sheet()
+    all_species = parser.extract_species()
     print(f"Total species in file: {len(all_species)}")
     
-    # Convert to DataFrame for easier sampling
-    data = []
-    for species in all_species:
-        data.append({
-            'Species': species.scientific_name,
-            'Genus': species.genus or '',
-            'Family': species.family or '',
-            'Order': species.order or '',
-            'Class': species.class_ or '',
-            'Phylum': species.phylum or '',
-            'Kingdom': species.kingdom or '',
-            'Realm': species.realm or '',
-            'Genome_Composition': species.genome_composition or '',
-            'Host_Source': species.host_source or ''
-        })
+    # Convert to DataFrame for easier sampling, one column list at a time
+    rank_columns = {
+        'Genus': 'genus',
+        'Family': 'family',
+        'Order': 'order',
+        'Class': 'class_',
+        'Phylum': 'phylum',
+        'Kingdom': 'kingdom',
+        'Realm': 'realm',
+        'Genome_Composition': 'genome_composition'
+    }
+    data = {'Species': [species.species for species in all_species]}
+    for column, attribute in rank_columns.items():
+        data[column] = [getattr(species, attribute) or '' for species in all_species]
     
     df = pd.DataFrame(data)
     
+    # Low-cardinality ranks compare and group on integer codes as categoricals
+    df = df.astype({
+        column: 'category'
+        for column in ('Realm', 'Genome_Composition', 'Kingdom',
+                       'Phylum', 'Class', 'Order', 'Family')
+    })
+    
     # Strategy: Get diverse sample
-    sample_species = []
+    # Collect row labels only and build the sample frame once at the end.
+    # A dict keeps first-picked order and drops repeats as labels arrive.
+    picked = {}
     
-    # 1. Get species from each realm (if exists)
-    realms = df['Realm'].unique()
-    realms = [r for r in realms if r]  # Remove empty
+    def stratum_head(column: str, keep, n: int) -> pd.Index:
+        # Shuffling once and taking the head of each group samples every
+        # stratum in a single pass, small groups included
+        values = df[column].reindex(np.random.permutation(df.index))
+        values = values[values.isin(keep)]
+        return values.groupby(values, sort=False).head(n).index
     
-    for realm in realms[:7]:  # Max 7 realms
-        realm_species = df[df['Realm'] == realm].sample(
-            min(5, len(df[df['Realm'] == realm]))
-        )
-        sample_species.append(realm_species)
+    # 1. Get species from each realm (if exists)
+    realms = df.loc[df['Realm'].ne(''), 'Realm'].unique()[:7]  # Max 7 realms
+    picked.update(dict.fromkeys(stratum_head('Realm', realms, 5)))
     
     # 2. Get different genome types
-    genome_types = df['Genome_Composition'].unique()
-    genome_types = [g for g in genome_types if g][:10]  # Top 10 types
-    
-    for genome in genome_types:
-        genome_species = df[df['Genome_Composition'] == genome].sample(
-            min(2, len(df[df['Genome_Composition'] == genome]))
-        )
-        sample_species.append(genome_species)
+    # Later picks would only be cut off by the sample size, so skip them
+    # once it is reached
+    if len(picked) < sample_size:
+        # Categorical value_counts reports every category, so drop the blank one
+        # by label rather than by filtering rows
+        genome_counts = df['Genome_Composition'].value_counts().drop('', errors='ignore')
+        genome_types = genome_counts.head(10).index  # Top 10 types
+        picked.update(dict.fromkeys(stratum_head('Genome_Composition', genome_types, 2)))
     
     # 3. Get well-known viruses
     well_known = [
@@ -95,28 +136,32 @@ def create_sample_dataset(msl_file: str, sample_size: int = 50,
         'Escherichia phage T4'
     ]
     
-    for virus in well_known:
-        matches = df[df['Species'].str.contains(virus, case=False, na=False)]
-        if not matches.empty:
-            sample_species.append(matches.head(1))
+    if len(picked) < sample_size:
+        # One scan of the full list, then attribute the few hits to each name
+        well_known_pattern = re.compile('|'.join(map(re.escape, well_known)), re.IGNORECASE)
+        well_known_matches = df[df['Species'].str.contains(well_known_pattern, na=False)]
+        
+        for virus in well_known:
+            matches = well_known_matches[
+                well_known_matches['Species'].str.contains(virus, case=False, regex=False)
+            ]
+            if not matches.empty:
+                picked.setdefault(matches.index[0])
     
-    # Combine and deduplicate
-    sample_df = pd.concat(sample_species).drop_duplicates()
+    sample_idx = list(picked)[:sample_size]
     
     # If we need more, randomly sample
-    if len(sample_df) < sample_size:
-        remaining = sample_size - len(sample_df)
-        additional = df[~df['Species'].isin(sample_df['Species'])].sample(
-            min(remaining, len(df) - len(sample_df))
-        )
-        sample_df = pd.concat([sample_df, additional])
+    if len(sample_idx) < sample_size:
+        remaining = sample_size - len(sample_idx)
+        rest = df.index.difference(sample_idx)
+        sample_idx.extend(np.random.choice(rest, min(remaining, len(rest)), replace=False))
     
-    # Limit to sample size
-    sample_df = sample_df.head(sample_size)
+    sample_df = df.loc[sample_idx]
     
-    # Save the sample
-    output_path = Path(output_dir)
+    # Save the sample, invalidating any earlier stamp before touching outputs
     output_path.mkdir(parents=True, exist_ok=True)
+    for stale in output_path.glob('.cache_*'):
+        stale.unlink()
     
     # Save as CSV
     csv_path = output_path / 'sample_msl_data.csv'
@@ -127,50 +172,65 @@ def create_sample_dataset(msl_file: str, sample_size: int = 50,
     yaml_dir = output_path / 'sample_species'
     yaml_dir.mkdir(exist_ok=True)
     
-    for _, row in sample_df.iterrows():
+    # Serialize everything first, then write the files from a small thread pool
+    # Safe filenames for the whole column in one vectorized pass
+    safe_names = sample_df['Species'].str.replace(r'[ /]', '_', regex=True)
+    
+    yaml_files = []
+    for row, safe_name in zip(sample_df.itertuples(index=False), safe_names):
         species_data = {
-            'scientific_name': row['Species'],
+            'scientific_name': row.Species,
             'classification': {
-                'genus': row['Genus'],
-                'family': row['Family'],
-                'order': row['Order'],
-                'class': row['Class'],
-                'phylum': row['Phylum'],
-                'kingdom': row['Kingdom'],
-                'realm': row['Realm']
+                'genus': row.Genus,
+                'family': row.Family,
+                'order': row.Order,
+                'class': row.Class,
+                'phylum': row.Phylum,
+                'kingdom': row.Kingdom,
+                'realm': row.Realm
             },
             'genome': {
-                'composition': row['Genome_Composition']
-            },
-            'host': row['Host_Source']
+                'composition': row.Genome_Composition
+            }
         }
         
-        # Create safe filename
-        safe_name = row['Species'].replace(' ', '_').replace('/', '_')
         yaml_path = yaml_dir / f"{safe_name}.yaml"
         
-        with open(yaml_path, 'w') as f:
-            yaml.dump(species_data, f, default_flow_style=False)
+        payload = yaml.dump(species_data, default_flow_style=False)
+        yaml_files.append((yaml_path, payload.encode('utf-8')))
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda item: item[0].write_bytes(item[1]), yaml_files))
     
     print(f"Created {len(sample_df)} YAML files in {yaml_dir}")
     
     # Create statistics
+    # Unique each column once on its raw array and reuse it for counts and coverage
+    uniques = {
+        column: pd.unique(sample_df[column].to_numpy())
+        for column in ('Realm', 'Family', 'Genome_Composition')
+    }
+    # Most common genome types first; categorical counts include unused categories
+    genome_counts = sample_df['Genome_Composition'].value_counts()
     stats = {
         'total_species': len(sample_df),
-        'realms': sample_df['Realm'].nunique(),
-        'families': sample_df['Family'].nunique(),
-        'genome_types': sample_df['Genome_Composition'].nunique(),
-        'host_types': sample_df['Host_Source'].nunique(),
+        'realms': len(uniques['Realm']),
+        'families': len(uniques['Family']),
+        'genome_types': len(uniques['Genome_Composition']),
         'coverage': {
-            'realms': list(sample_df['Realm'].unique()),
-            'genome_types': list(sample_df['Genome_Composition'].unique()[:10])
+            'realms': uniques['Realm'].tolist(),
+            'genome_types': genome_counts[genome_counts > 0].head(10).index.tolist()
         }
     }
     
     # Save statistics
-    stats_path = output_path / 'sample_statistics.json'
-    with open(stats_path, 'w') as f:
-        json.dump(stats, f, indent=2)
+    if orjson is not None:
+        stats_path.write_bytes(orjson.dumps(stats, option=orjson.OPT_INDENT_2))
+    else:
+        stats_path.write_text(json.dumps(stats, indent=2))
+    
+    # Stamp last, so an interrupted run is never mistaken for a finished one
+    stamp_path.touch()
     
     print(f"\nSample statistics:")
     print(f"- Species: {stats['total_species']}")
@@ -201,6 +261,11 @@ def main():
         default="data/sample",
         help="Output directory (default: data/sample)"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Rebuild the sample even if one exists for this MSL file"
+    )
     
     args = parser.parse_args()
     
@@ -214,7 +279,8 @@ def main():
     stats = create_sample_dataset(
         args.msl_file,
         sample_size=args.size,
-        output_dir=args.output
+        output_dir=args.output,
+        use_cache=not args.no_cache
     )
     
     print(f"\nSample dataset created successfully in {args.output}/")
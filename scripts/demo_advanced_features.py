@@ -14,14 +14,52 @@ import sys
 import os
 import asyncio
 import time
+import functools
+import threading
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from advanced_features.nlq_interface import NaturalLanguageQuery
-from advanced_features.classification_ai import ClassificationAI
-from advanced_features.database_sync import DatabaseSync
+# The feature modules pull in heavy dependencies, so each factory imports
+# its own on first use
+
+
+def _serialized(factory):
+    """Let one thread at a time into a cached factory.
+    
+    lru_cache does not hold a lock while the factory runs, so the prefetch
+    thread and the main thread could otherwise both build the same backend
+    """
+    lock = threading.Lock()
+    
+    @functools.wraps(factory)
+    def wrapper(*args, **kwargs):
+        with lock:
+            return factory(*args, **kwargs)
+    
+    return wrapper
+
+@_serialized
+@functools.lru_cache(maxsize=4)
+def _get_nlq(repo_path: str, use_openai: bool = False, enable_cache: bool = True):
+    """Shared NaturalLanguageQuery per repo, so each demo reuses one index"""
+    from advanced_features.nlq_interface import NaturalLanguageQuery
+    return NaturalLanguageQuery(repo_path, use_openai=use_openai, enable_cache=enable_cache)
+
+@_serialized
+@functools.lru_cache(maxsize=4)
+def _get_classifier(repo_path: str):
+    """Shared ClassificationAI per repo"""
+    from advanced_features.classification_ai import ClassificationAI
+    return ClassificationAI(repo_path)
+
+@_serialized
+@functools.lru_cache(maxsize=4)
+def _get_db_sync(repo_path: str, email: str):
+    """Shared DatabaseSync per repo and contact email"""
+    from advanced_features.database_sync import DatabaseSync
+    return DatabaseSync(repo_path, email)
 
 def print_header(title: str):
     """Print a formatted section header"""
@@ -50,7 +88,7 @@ def demo_natural_language_query():
     
     # Initialize NLQ interface
     print("\n🔧 Initializing Natural Language Query interface...")
-    nlq = NaturalLanguageQuery(repo_path, use_openai=False, enable_cache=True)
+    nlq = _get_nlq(repo_path, use_openai=False, enable_cache=True)
     print("✅ NLQ interface ready!")
     
     # Demo queries with explanations
@@ -120,7 +158,7 @@ def demo_ai_classification():
     print("🔧 Initializing AI Classification system...")
     
     try:
-        ai_classifier = ClassificationAI(repo_path)
+        ai_classifier = _get_classifier(repo_path)
         print("✅ AI Classification system ready!")
     except Exception as e:
         print(f"❌ Failed to initialize AI classifier: {e}")
@@ -206,14 +244,13 @@ def demo_ai_classification():
     
     test_families = ['Coronaviridae', 'Rhabdoviridae', 'Siphoviridae', 'Picornaviridae']
     
-    for family in test_families:
-        stability = ai_classifier.stability_analyzer.get_family_stability(family)
-        warnings = ai_classifier.stability_analyzer.get_red_flags(family)
-        
+    family_analysis = ai_classifier.stability_analyzer.analyze_batch(test_families)
+    
+    for family, analysis in family_analysis.items():
         print(f"📊 {family}:")
-        print(f"   Stability score: {stability:.2f}")
-        if warnings:
-            for warning in warnings:
+        print(f"   Stability score: {analysis['stability']:.2f}")
+        if analysis['warnings']:
+            for warning in analysis['warnings']:
                 print(f"   {warning}")
         else:
             print(f"   ✅ No stability concerns")
@@ -231,7 +268,7 @@ def demo_database_sync():
     print("🔧 Initializing Database Synchronization system...")
     
     try:
-        db_sync = DatabaseSync(repo_path, test_email)
+        db_sync = _get_db_sync(repo_path, test_email)
         print("✅ Database sync system ready!")
         print(f"📡 Monitoring databases: {list(db_sync.detector.adapters.keys())}")
     except Exception as e:
@@ -335,7 +372,7 @@ def demo_integration_scenario():
     
     repo_path = "output/git_taxonomy"
     if os.path.exists(repo_path):
-        nlq = NaturalLanguageQuery(repo_path, enable_cache=True)
+        nlq = _get_nlq(repo_path, use_openai=False, enable_cache=True)
         
         research_queries = [
             "Find coronaviruses that infect bats",
@@ -355,7 +392,7 @@ def demo_integration_scenario():
     print_subheader("Step 2: AI Classification (Classification AI)")
     
     try:
-        ai_classifier = ClassificationAI(repo_path)
+        ai_classifier = _get_classifier(repo_path)
         prediction = ai_classifier.suggest_classification(
             genome_sequence=new_virus["genome_sequence"],
             metadata=new_virus["metadata"]
@@ -378,7 +415,7 @@ def demo_integration_scenario():
     print_subheader("Step 3: Database Consistency Check (Database Sync)")
     
     try:
-        db_sync = DatabaseSync(repo_path, "researcher@university.edu")
+        db_sync = _get_db_sync(repo_path, "researcher@university.edu")
         
         async def check_consistency():
             # Check related coronavirus entries
@@ -411,6 +448,44 @@ def demo_integration_scenario():
    - Monitor for database updates
 """)
 
+async def prepare_features(repo_path: str, email: str):
+    """Initialize NLQ, AI classification and database sync side by side"""
+    if not os.path.exists(repo_path):
+        return
+    
+    loop = asyncio.get_running_loop()
+    start_time = time.time()
+    
+    async def build(name, factory, *args, **kwargs):
+        # Same call shape as the demos so the lru_cache entries line up
+        await loop.run_in_executor(None, functools.partial(factory, *args, **kwargs))
+        return name
+    
+    tasks = [
+        build("Natural Language Query", _get_nlq, repo_path, use_openai=False, enable_cache=True),
+        build("AI Classification", _get_classifier, repo_path),
+        build("Database Synchronization", _get_db_sync, repo_path, email)
+    ]
+    
+    print("🔧 Preparing feature backends...")
+    for task in asyncio.as_completed(tasks):
+        try:
+            name = await task
+            print(f"   ✅ {name} ready ({time.time() - start_time:.2f}s)")
+        except Exception as e:
+            # Leave it to the individual demo to report the failure
+            print(f"   ⚠️  Backend setup failed: {e}")
+
+def prefetch(factory):
+    """Build a backend on a daemon thread; the demo reports any failure itself"""
+    def run():
+        try:
+            factory()
+        except Exception:
+            pass
+    
+    threading.Thread(target=run, daemon=True).start()
+
 def main():
     """Main demo function"""
     print_header("ICTV-GIT ADVANCED FEATURES DEMONSTRATION")
@@ -436,17 +511,26 @@ This demonstration showcases three transformative features:
 Let's explore each feature...
 """)
     
-    # Run individual demos
+    # Build the three feature backends concurrently; the demos below pick
+    # them up from the cached factories
+    repo_path = "output/git_taxonomy"
+    asyncio.run(prepare_features(repo_path, "demo@ictv-git.org"))
+    
+    # Run individual demos, each with any backend it needs beyond the shared ones
     demos = [
-        ("Natural Language Query", demo_natural_language_query),
-        ("AI Classification", demo_ai_classification), 
-        ("Database Synchronization", demo_database_sync),
-        ("Integration Scenario", demo_integration_scenario)
+        ("Natural Language Query", demo_natural_language_query, None),
+        ("AI Classification", demo_ai_classification, None), 
+        ("Database Synchronization", demo_database_sync, None),
+        ("Integration Scenario", demo_integration_scenario,
+         functools.partial(_get_db_sync, repo_path, "researcher@university.edu"))
     ]
     
+    # Only pause between demos when someone is there to press Enter
+    interactive = sys.stdin.isatty()
+    
     results = {}
     
-    for demo_name, demo_func in demos:
+    for i, (demo_name, demo_func, _) in enumerate(demos):
         print(f"\n⏳ Starting {demo_name} demo...")
         try:
             success = demo_func()
@@ -455,7 +539,12 @@ Let's explore each feature...
             print(f"❌ {demo_name} demo failed: {e}")
             results[demo_name] = "❌ Failed"
         
-        input("\nPress Enter to continue to next demo...")
+        # Warm the next demo's backend while the reader takes in this one
+        if i + 1 < len(demos) and demos[i + 1][2]:
+            prefetch(demos[i + 1][2])
+        
+        if interactive:
+            input("\nPress Enter to continue to next demo...")
     
     # Final summary
     print_header("DEMONSTRATION SUMMARY")
@@ -8,15 +8,25 @@ with fallback web scraping if direct URLs fail.
 
 import os
 import sys
+import json
+import time
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
 from datetime import datetime
-from bs4 import BeautifulSoup
+import html
 import re
 from urllib.parse import urljoin
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
 # Add src to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
@@ -27,6 +37,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# href of every <a> tag on the listing page, quoted either way
+_LINK_HREF_RE = re.compile(r'<a\s[^>]*?\bhref\s*=\s*(["\'])(.*?)\1', re.IGNORECASE | re.DOTALL)
+_MSL_VERSION_RE = re.compile(r'MSL(\d+)')
+
 
 class MSLDownloader:
     """Downloads ICTV MSL files with caching and fallback mechanisms."""
@@ -42,6 +56,12 @@ class MSLDownloader:
     # ICTV MSL listing page
     MSL_LIST_URL = 'https://ictv.global/msl'
     
+    # Bytes read per iteration when streaming a download to disk
+    STREAM_CHUNK_SIZE = 1 << 20
+    
+    # Seconds before the listing page is re-scraped for newer MSL versions
+    SCRAPE_MAX_AGE = 7 * 24 * 3600
+    
     def __init__(self, data_dir: Optional[str] = None):
         """Initialize downloader with data directory."""
         if data_dir:
@@ -52,82 +72,284 @@ class MSLDownloader:
         # Create directory if it doesn't exist
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
+        # One pooled session keeps the connection to ictv.global alive across
+        # the scrape and every file download
+        self.session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.5,
+                        status_forcelist=[429, 500, 502, 503, 504])
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                                   max_retries=retries))
+        
+        # Links found on the MSL listing page, fetched at most once per run
+        self._scraped_urls: Optional[Dict[str, str]] = None
+        
         logger.info(f"Data directory: {self.data_dir}")
     
+    @staticmethod
+    def _meta_path(filepath: Path) -> Path:
+        """Sidecar file holding the server validators for a download."""
+        return filepath.with_name(filepath.name + '.meta.json')
+    
+    @staticmethod
+    def _remote_validators(headers) -> Dict:
+        """Pick the cache validators out of HEAD response headers."""
+        content_length = headers.get('Content-Length')
+        return {
+            'content_length': int(content_length) if content_length else None,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'accept_ranges': headers.get('Accept-Ranges', '').lower() == 'bytes'
+        }
+    
+    def _read_meta(self, filepath: Path) -> Optional[Dict]:
+        """Load the stored validators for a file, if any."""
+        try:
+            return json.loads(self._meta_path(filepath).read_text())
+        except (OSError, ValueError):
+            return None
+    
+    def _write_meta(self, filepath: Path, url: str, remote: Dict, complete: bool):
+        """Record the validators a download was made against."""
+        meta = {
+            'url': url,
+            'etag': remote['etag'],
+            'last_modified': remote['last_modified'],
+            'content_length': remote['content_length'],
+            'complete': complete
+        }
+        self._meta_path(filepath).write_text(json.dumps(meta, indent=2))
+    
+    def _same_version(self, stored: Optional[Dict], remote: Dict) -> bool:
+        """Whether stored validators describe the file the server has now."""
+        return (stored is not None
+                and stored.get('etag') == remote['etag']
+                and stored.get('last_modified') == remote['last_modified'])
+    
+    def _is_current(self, filepath: Path, remote: Dict) -> bool:
+        """Whether a file on disk is a complete copy of the server's version."""
+        size = filepath.stat().st_size
+        if remote['content_length'] is not None and size != remote['content_length']:
+            return False
+        
+        stored = self._read_meta(filepath)
+        if stored is None:
+            # Downloaded before validators were recorded; trust a matching size
+            return remote['content_length'] is not None
+        
+        return stored.get('complete', False) and self._same_version(stored, remote)
+    
+    def _resume_offset(self, filepath: Path, remote: Dict) -> int:
+        """Bytes already on disk that a range request can continue from."""
+        if not filepath.exists() or not remote['accept_ranges'] or not remote['content_length']:
+            return 0
+        if not (remote['etag'] or remote['last_modified']):
+            return 0
+        if not self._same_version(self._read_meta(filepath), remote):
+            return 0
+        
+        size = filepath.stat().st_size
+        return size if 0 < size < remote['content_length'] else 0
+    
+    def _plan_download(self, filepath: Path, url: str, remote: Optional[Dict]) -> Optional[Dict[str, str]]:
+        """Decide how to fetch a file given its HEAD validators.
+        
+        Returns:
+            None when the file on disk is already current, otherwise the
+            request headers to send (a Range request when resuming)
+        """
+        filename = filepath.name
+        
+        if filepath.exists():
+            if remote is None:
+                logger.info(f"File already exists (server unreachable, not revalidated): {filename}")
+                return None
+            if self._is_current(filepath, remote):
+                self._write_meta(filepath, url, remote, complete=True)
+                logger.info(f"File already exists and is up to date: {filename}")
+                return None
+        
+        if remote is None:
+            return {}
+        
+        offset = self._resume_offset(filepath, remote)
+        self._write_meta(filepath, url, remote, complete=False)
+        
+        if not offset:
+            logger.info(f"Downloading {filename} from {url}")
+            return {}
+        
+        logger.info(f"Resuming {filename} from byte {offset}")
+        return {
+            'Range': f'bytes={offset}-',
+            'If-Range': remote['etag'] or remote['last_modified']
+        }
+    
+    def _finish_download(self, filepath: Path, url: str, remote: Optional[Dict]):
+        """Mark a finished download as complete in its sidecar."""
+        if remote is not None:
+            self._write_meta(filepath, url, remote, complete=True)
+        logger.info(f"Successfully downloaded: {filepath.name}")
+    
     def download_file(self, url: str, filename: str) -> bool:
         """Download a file from URL to data directory."""
         filepath = self.data_dir / filename
         
-        # Check if file already exists
-        if filepath.exists():
-            logger.info(f"File already exists: {filename}")
-            return True
+        # Revalidate against the server rather than trusting any file on disk
+        try:
+            head = self.session.head(url, timeout=15, allow_redirects=True)
+            remote = self._remote_validators(head.headers) if head.ok else None
+        except requests.exceptions.RequestException:
+            remote = None
         
-        logger.info(f"Downloading {filename} from {url}")
+        headers = self._plan_download(filepath, url, remote)
+        if headers is None:
+            return True
         
         try:
             # Download with streaming to handle large files
-            response = requests.get(url, stream=True, timeout=30)
+            response = self.session.get(url, stream=True, timeout=30, headers=headers)
             response.raise_for_status()
             
+            # Append only if the server honoured the range request
+            mode = 'ab' if response.status_code == 206 else 'wb'
+            
             # Save file
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
+            with open(filepath, mode) as f:
+                for chunk in response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE):
                     f.write(chunk)
             
-            logger.info(f"Successfully downloaded: {filename}")
+            self._finish_download(filepath, url, remote)
             return True
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to download {filename}: {e}")
             return False
     
+    async def _download_file_async(self, session, url: str, filename: str) -> bool:
+        """Download a file from URL to data directory on an aiohttp session."""
+        filepath = self.data_dir / filename
+        
+        # Revalidate against the server rather than trusting any file on disk
+        try:
+            async with session.head(url, allow_redirects=True) as head:
+                remote = self._remote_validators(head.headers) if head.ok else None
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            remote = None
+        
+        headers = self._plan_download(filepath, url, remote)
+        if headers is None:
+            return True
+        
+        try:
+            async with session.get(url, headers=headers) as response:
+                response.raise_for_status()
+                
+                # Append only if the server honoured the range request
+                mode = 'ab' if response.status == 206 else 'wb'
+                
+                # Save file
+                with open(filepath, mode) as f:
+                    async for chunk in response.content.iter_chunked(self.STREAM_CHUNK_SIZE):
+                        f.write(chunk)
+            
+            self._finish_download(filepath, url, remote)
+            return True
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Failed to download {filename}: {e}")
+            return False
+    
+    async def _download_all(self, downloads: Dict[str, Tuple[str, str]]) -> Dict[str, bool]:
+        """Download all files concurrently over one aiohttp session."""
+        connector = aiohttp.TCPConnector(limit_per_host=4)
+        timeout = aiohttp.ClientTimeout(sock_connect=30, sock_read=30)
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            outcomes = await asyncio.gather(*[
+                self._download_file_async(session, url, filename)
+                for url, filename in downloads.values()
+            ])
+        
+        return dict(zip(downloads, outcomes))
+    
+    def download_files(self, downloads: Dict[str, Tuple[str, str]]) -> Dict[str, bool]:
+        """Download several files, keyed by MSL version, as (url, filename) pairs.
+        
+        The files are fetched concurrently when aiohttp is installed and one
+        after another over the pooled session otherwise.
+        """
+        if aiohttp is not None and len(downloads) > 1:
+            return asyncio.run(self._download_all(downloads))
+        
+        return {
+            msl_version: self.download_file(url, filename)
+            for msl_version, (url, filename) in downloads.items()
+        }
+    
     def scrape_msl_urls(self) -> Dict[str, str]:
         """Scrape ICTV website for MSL file URLs."""
+        if self._scraped_urls is not None:
+            return self._scraped_urls
+        
         logger.info(f"Scraping MSL URLs from {self.MSL_LIST_URL}")
         
         try:
-            response = requests.get(self.MSL_LIST_URL, timeout=30)
+            response = self.session.get(self.MSL_LIST_URL, timeout=30)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'lxml')
-            
-            # Find all Excel file links
+            # Find all Excel file links with a regex scan rather than a full DOM
             excel_links = {}
             
             # Look for links containing 'Master_Species_List' and ending with .xlsx or .xls
-            for link in soup.find_all('a', href=True):
-                href = link['href']
+            for link in _LINK_HREF_RE.finditer(response.text):
+                href = html.unescape(link.group(2).strip())
                 
                 if 'Master_Species_List' in href and (href.endswith('.xlsx') or href.endswith('.xls')):
                     # Extract MSL version number
-                    match = re.search(r'MSL(\d+)', href)
+                    match = _MSL_VERSION_RE.search(href)
                     if match:
                         msl_version = f"MSL{match.group(1)}"
                         full_url = urljoin(self.MSL_LIST_URL, href)
                         excel_links[msl_version] = full_url
                         logger.info(f"Found {msl_version}: {full_url}")
             
+            self._scraped_urls = excel_links
+            self._scrape_stamp_path().touch()
             return excel_links
             
         except Exception as e:
             logger.error(f"Failed to scrape MSL URLs: {e}")
             return {}
     
+    def _scrape_stamp_path(self) -> Path:
+        """Timestamp file recording the last successful listing scrape."""
+        return self.data_dir / '.last_scrape'
+    
+    def _scrape_is_stale(self) -> bool:
+        """Check whether the listing page is due for another scrape."""
+        try:
+            age = time.time() - self._scrape_stamp_path().stat().st_mtime
+        except FileNotFoundError:
+            return True
+        return age > self.SCRAPE_MAX_AGE
+    
     def download_known_msls(self) -> Dict[str, bool]:
         """Download MSL files using known URLs."""
-        results = {}
-        
-        for msl_version, url in self.KNOWN_URLS.items():
-            # Generate filename
-            filename = f"{msl_version}_{Path(url).name}"
-            success = self.download_file(url, filename)
-            results[msl_version] = success
+        # Generate filenames
+        downloads = {
+            msl_version: (url, f"{msl_version}_{Path(url).name}")
+            for msl_version, url in self.KNOWN_URLS.items()
+        }
         
-        return results
+        return self.download_files(downloads)
     
-    def download_all_available(self) -> Dict[str, bool]:
-        """Download all available MSL files with fallback to scraping."""
+    def download_all_available(self, check_newer: bool = False) -> Dict[str, bool]:
+        """Download all available MSL files with fallback to scraping.
+        
+        The listing page is only scraped for newer MSL versions when
+        check_newer is set, when the last scrape is older than
+        SCRAPE_MAX_AGE, or when it was already fetched for a fallback.
+        """
         results = {}
         
         # First try known URLs
@@ -143,40 +365,60 @@ class MSLDownloader:
             
             scraped_urls = self.scrape_msl_urls()
             
-            for msl_version in failed:
-                if msl_version in scraped_urls:
-                    url = scraped_urls[msl_version]
-                    filename = f"{msl_version}_{Path(url).name}"
-                    success = self.download_file(url, filename)
-                    results[msl_version] = success
+            retries = {
+                msl_version: (scraped_urls[msl_version], f"{msl_version}_{Path(scraped_urls[msl_version]).name}")
+                for msl_version in failed
+                if msl_version in scraped_urls
+            }
+            results.update(self.download_files(retries))
         
         # Also try to find any newer MSL versions
-        logger.info("Checking for newer MSL versions...")
-        scraped_urls = self.scrape_msl_urls()
-        
-        for msl_version, url in scraped_urls.items():
-            if msl_version not in results:
-                filename = f"{msl_version}_{Path(url).name}"
-                success = self.download_file(url, filename)
-                results[msl_version] = success
+        if check_newer or self._scraped_urls is not None or self._scrape_is_stale():
+            logger.info("Checking for newer MSL versions...")
+            scraped_urls = self.scrape_msl_urls()
+            
+            newer = {
+                msl_version: (url, f"{msl_version}_{Path(url).name}")
+                for msl_version, url in scraped_urls.items()
+                if msl_version not in results
+            }
+            results.update(self.download_files(newer))
+        else:
+            logger.info("Skipping check for newer MSL versions (listing scraped recently)")
         
         return results
     
+    def list_downloaded_files_with_sizes(self) -> List[Tuple[str, int]]:
+        """List all downloaded MSL files with their sizes in bytes."""
+        # One directory scan; DirEntry carries the stat data with the listing
+        with os.scandir(self.data_dir) as entries:
+            return sorted(
+                (entry.name, entry.stat().st_size)
+                for entry in entries
+                if entry.name.endswith(('.xlsx', '.xls'))
+            )
+    
     def list_downloaded_files(self) -> List[str]:
         """List all downloaded MSL files."""
-        excel_files = list(self.data_dir.glob("*.xlsx")) + list(self.data_dir.glob("*.xls"))
-        return sorted([f.name for f in excel_files])
+        return [name for name, _ in self.list_downloaded_files_with_sizes()]
 
 
 def main():
     """Main function to download MSL files."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Download ICTV MSL files')
+    parser.add_argument('--check-newer', action='store_true',
+                       help='Always scrape the ICTV site for newer MSL versions')
+    args = parser.parse_args()
+    
     downloader = MSLDownloader()
     
     print("ICTV MSL Downloader")
     print("=" * 50)
     
     # Download all available files
-    results = downloader.download_all_available()
+    results = downloader.download_all_available(check_newer=args.check_newer)
     
     # Summary
     print("\nDownload Summary:")
@@ -195,11 +437,10 @@ def main():
     print("\nAvailable MSL files:")
     print("-" * 50)
     
-    files = downloader.list_downloaded_files()
+    files = downloader.list_downloaded_files_with_sizes()
     if files:
-        for filename in files:
-            filepath = downloader.data_dir / filename
-            size_mb = filepath.stat().st_size / (1024 * 1024)
+        for filename, size in files:
+            size_mb = size / (1024 * 1024)
             print(f"  - {filename} ({size_mb:.1f} MB)")
     else:
         print("  No MSL files found")
@@ -10,6 +10,13 @@ import sys
 from pathlib import Path
 import logging
 import json
+from collections import defaultdict
+from itertools import islice
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Add src to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
@@ -25,6 +32,32 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _rank_diff(change) -> dict:
+    """Describe the order/family/genus values that differ for a change."""
+    old_class = change.old_classification
+    new_class = change.new_classification
+    diff = {}
+    for rank in ('order', 'family', 'genus'):
+        old_val = old_class.get(rank)
+        new_val = new_class.get(rank)
+        if old_val != new_val:
+            diff[rank] = f"{old_val} → {new_val}"
+    return diff
+
+
+def _change_example(change) -> dict:
+    """JSON summary of a single change."""
+    return {
+        'species': change.species_name,
+        'change_type': change.change_type,
+        'subtype': change.change_subtype,
+        'severity': change.severity,
+        'description': change.details.get('description'),
+        'validation_status': change.validation_status,
+        'changes': _rank_diff(change)
+    }
+
+
 def enhanced_caudovirales_analysis():
     """Run enhanced analysis with proper change classification."""
     
@@ -59,25 +92,30 @@ def enhanced_caudovirales_analysis():
     
     caudovirales_changes = []
     
+    # Caudovirales changes grouped by (change type, subtype), in the same pass
+    caudovirales_by_type = defaultdict(list)
+    
     for change in classification_changes:
+        change_type = change.change_type
+        change_subtype = change.change_subtype
+        
         # Add to summary
         summary.add_change(
-            change.change_type, change.change_subtype, change.severity,
+            change_type, change_subtype, change.severity,
             change.validation_status, change.validation_notes
         )
         
         # Categorize
-        if change.change_type in change_categories:
-            change_categories[change.change_type].append(change)
+        if change_type in change_categories:
+            change_categories[change_type].append(change)
         else:
             change_categories['other'].append(change)
         
         # Check if related to Caudovirales
-        old_order = change.old_classification.get('order')
-        new_order = change.new_classification.get('order')
-        
-        if old_order == 'Caudovirales' or new_order == 'Caudovirales':
+        if (change.old_classification.get('order') == 'Caudovirales'
+                or change.new_classification.get('order') == 'Caudovirales'):
             caudovirales_changes.append(change)
+            caudovirales_by_type[(change_type, change_subtype)].append(change)
     
     # Display summary statistics
     print("\nOVERALL CHANGE SUMMARY:")
@@ -110,29 +148,19 @@ def enhanced_caudovirales_analysis():
     print("-" * 40)
     print(f"Total Caudovirales-related changes: {len(caudovirales_changes):,}")
     
-    # Categorize Caudovirales changes
-    caudovirales_by_type = {}
-    for change in caudovirales_changes:
-        change_key = f"{change.change_type}:{change.change_subtype}"
-        if change_key not in caudovirales_by_type:
-            caudovirales_by_type[change_key] = []
-        caudovirales_by_type[change_key].append(change)
-    
     print("\nChange Types in Caudovirales:")
-    for change_key, changes_list in sorted(caudovirales_by_type.items()):
-        change_type, subtype = change_key.split(':')
+    for (change_type, subtype), changes_list in sorted(caudovirales_by_type.items()):
         print(f"  {change_type} ({subtype}): {len(changes_list)} species")
     
     # Show examples of each type
     print(f"\nDETAILED CHANGE EXAMPLES:")
     print("=" * 80)
     
-    for change_key, changes_list in sorted(caudovirales_by_type.items()):
-        change_type, subtype = change_key.split(':')
+    for (change_type, subtype), changes_list in sorted(caudovirales_by_type.items()):
         print(f"\n{change_type.upper()} - {subtype}:")
         print("-" * 60)
         
-        for i, change in enumerate(changes_list[:3]):  # Show first 3 examples
+        for i, change in enumerate(islice(changes_list, 3)):  # Show first 3 examples
             print(f"\nExample {i+1}: {change.species_name}")
             print(f"  Description: {change.details.get('description', 'N/A')}")
             print(f"  Severity: {change.severity}")
@@ -171,32 +199,25 @@ def enhanced_caudovirales_analysis():
         },
         'validation_summary': validation_summary,
         'caudovirales_by_type': {
-            change_key: {
+            f"{change_type}:{subtype}": {
                 'count': len(changes_list),
                 'examples': [
-                    {
-                        'species': change.species_name,
-                        'change_type': change.change_type,
-                        'subtype': change.change_subtype,
-                        'severity': change.severity,
-                        'description': change.details.get('description'),
-                        'validation_status': change.validation_status,
-                        'changes': {
-                            rank: f"{change.old_classification.get(rank)} → {change.new_classification.get(rank)}"
-                            for rank in ['order', 'family', 'genus']
-                            if change.old_classification.get(rank) != change.new_classification.get(rank)
-                        }
-                    }
-                    for change in changes_list[:5]  # Save top 5 examples
+                    _change_example(change)
+                    for change in islice(changes_list, 5)  # Save top 5 examples
                 ]
             }
-            for change_key, changes_list in caudovirales_by_type.items()
+            for (change_type, subtype), changes_list in caudovirales_by_type.items()
         }
     }
     
     results_path = output_dir / 'enhanced_caudovirales_analysis.json'
-    with open(results_path, 'w') as f:
-        json.dump(enhanced_results, f, indent=2)
+    if orjson is not None:
+        results_path.write_bytes(orjson.dumps(
+            enhanced_results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        ))
+    else:
+        with open(results_path, 'w') as f:
+            json.dump(enhanced_results, f, indent=2)
     
     logger.info(f"Enhanced analysis saved to: {results_path}")
     
@@ -9,43 +9,98 @@ NOTE: This script requires Excel or LibreOffice Calc to be installed on your sys
 It will provide instructions for manual conversion if automated conversion fails.
 """
 
+import functools
+import os
+import shutil
+import signal
 import subprocess
 import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Optional
 import csv
 import platform
 
 
-def convert_with_libreoffice(excel_file: Path, csv_file: Path) -> bool:
-    """Try to convert Excel to CSV using LibreOffice."""
+# Common LibreOffice paths
+LIBREOFFICE_PATHS = [
+    '/Applications/LibreOffice.app/Contents/MacOS/soffice',  # macOS
+    'soffice',  # Linux/Windows (if in PATH)
+    '/usr/bin/soffice',  # Linux
+    'C:\\Program Files\\LibreOffice\\program\\soffice.exe',  # Windows
+]
+
+
+# Seconds before a conversion is treated as hung (e.g. on a corrupt workbook)
+CONVERSION_TIMEOUT = 120
+
+
+@functools.lru_cache(maxsize=None)
+def find_libreoffice() -> Optional[str]:
+    """Locate the soffice executable once per run."""
+    for soffice_path in LIBREOFFICE_PATHS:
+        resolved = shutil.which(soffice_path)
+        if resolved:
+            return resolved
+        if Path(soffice_path).exists():
+            return soffice_path
+    return None
+
+
+def convert_with_libreoffice(excel_file: Path, csv_file: Path,
+                             profile_dir: Optional[Path] = None) -> bool:
+    """Try to convert Excel to CSV using LibreOffice.
+    
+    Running soffice instances that share a user profile hand their work to
+    each other or fail on its lock, so concurrent callers pass their own
+    profile_dir.
+    """
+    soffice_path = find_libreoffice()
+    if soffice_path is None:
+        return False
+    
     try:
-        # Common LibreOffice paths
-        libreoffice_paths = [
-            '/Applications/LibreOffice.app/Contents/MacOS/soffice',  # macOS
-            'soffice',  # Linux/Windows (if in PATH)
-            '/usr/bin/soffice',  # Linux
-            'C:\\Program Files\\LibreOffice\\program\\soffice.exe',  # Windows
+        cmd = [
+            soffice_path,
+            '--headless',
+            '--convert-to',
+            'csv',
+            '--outdir',
+            str(csv_file.parent),
+            str(excel_file)
         ]
+        if profile_dir is not None:
+            cmd.insert(1, f'-env:UserInstallation={profile_dir.as_uri()}')
+        
+        # soffice runs in its own session so a hung conversion can be killed
+        # together with the soffice.bin child it forks
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            start_new_session=True
+        )
+        try:
+            _, stderr = process.communicate(timeout=CONVERSION_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            if hasattr(os, 'killpg'):
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+            process.communicate()
+            print(f"❌ Timed out converting {excel_file.name} after {CONVERSION_TIMEOUT}s")
+            return False
         
-        for soffice_path in libreoffice_paths:
-            try:
-                cmd = [
-                    soffice_path,
-                    '--headless',
-                    '--convert-to',
-                    'csv',
-                    '--outdir',
-                    str(csv_file.parent),
-                    str(excel_file)
-                ]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
-                    print(f"✅ Converted: {excel_file.name}")
-                    return True
-            except FileNotFoundError:
-                continue
+        if process.returncode == 0:
+            print(f"✅ Converted: {excel_file.name}")
+            return True
         
+        message = stderr.decode(errors='replace').strip()
+        if message:
+            print(f"❌ LibreOffice failed on {excel_file.name}: {message.splitlines()[-1]}")
         return False
     except Exception as e:
         print(f"Error with LibreOffice conversion: {e}")
@@ -110,22 +165,47 @@ def main():
     converted = 0
     failed = []
     
-    # Try to convert each file
+    # Skip files that are already converted
+    pending = []
     for excel_file in excel_files:
         csv_filename = excel_file.stem + ".csv"
         csv_file = csv_dir / csv_filename
         
-        # Skip if already converted
         if csv_file.exists():
             print(f"⏭️  Skipping {excel_file.name} (CSV already exists)")
             converted += 1
-            continue
-        
-        # Try LibreOffice conversion
-        if convert_with_libreoffice(excel_file, csv_file):
-            converted += 1
         else:
-            failed.append(excel_file)
+            pending.append((excel_file, csv_file))
+    
+    if pending and find_libreoffice() is None:
+        print("❌ LibreOffice (soffice) not found")
+        failed.extend(excel_file for excel_file, _ in pending)
+        pending = []
+    
+    # Each conversion is its own soffice process, so run a few side by side;
+    # the threads only wait on them. Every worker thread keeps one profile.
+    with tempfile.TemporaryDirectory(prefix='msl_soffice_') as profiles_root:
+        worker = threading.local()
+        
+        def convert(excel_file: Path, csv_file: Path) -> bool:
+            if not hasattr(worker, 'profile'):
+                worker.profile = Path(tempfile.mkdtemp(dir=profiles_root))
+            return convert_with_libreoffice(excel_file, csv_file, worker.profile)
+        
+        max_workers = min(4, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(convert, excel_file, csv_file): excel_file
+                for excel_file, csv_file in pending
+            }
+            for future in as_completed(futures):
+                if future.result():
+                    converted += 1
+                else:
+                    failed.append(futures[future])
+    
+    # Keep the manual-conversion list in directory order
+    failed.sort(key=excel_files.index)
     
     # Summary
     print("\n" + "="*60)
@@ -5,16 +5,26 @@ Fix the Genomics Era analysis by handling the MSL33/MSL34 2018 dual-release issu
 
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Figures are only saved to disk, never shown
 import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
 
+# Columns the fix works on; diff-based ones start with NaN and rates may be inf
+GROWTH_DTYPES = {
+    'year': 'int64',
+    'species': 'int64',
+    'species_growth': 'float64',
+    'years_since_previous': 'float64',
+    'annual_species_growth': 'float64'
+}
+
 def fix_genomics_era_calculation():
     """Fix the calculation that's causing missing Genomics era data."""
     
     # Read the original data
     data_path = Path(__file__).parent.parent / 'output' / 'research_analysis' / 'study1_growth_data.csv'
-    df = pd.read_csv(data_path)
+    df = pd.read_csv(data_path, dtype=GROWTH_DTYPES)
     
     print("Original data issues:")
     print("MSL33 and MSL34 both in 2018:")
@@ -27,39 +37,42 @@ def fix_genomics_era_calculation():
     # Let's treat MSL33→MSL34 as a mid-year adjustment and calculate properly
     
     # Method 1: Calculate cumulative annual growth for same-year releases
-    for i in range(1, len(df_fixed)):
-        years_diff = df_fixed.loc[i, 'years_since_previous']
-        species_growth = df_fixed.loc[i, 'species_growth']
-        
-        if years_diff == 0:  # Same year release
-            # For same-year releases, treat as cumulative growth for that year
-            if i > 1:
-                # Find the previous year's data
-                prev_year_idx = i - 1
-                while prev_year_idx > 0 and df_fixed.loc[prev_year_idx, 'years_since_previous'] == 0:
-                    prev_year_idx -= 1
-                
-                # Calculate cumulative growth for the year
-                year_start_species = df_fixed.loc[prev_year_idx, 'species']
-                current_species = df_fixed.loc[i, 'species']
-                cumulative_growth = current_species - year_start_species
-                
-                # Since it's still within the same year, use the cumulative growth
-                df_fixed.loc[i, 'annual_species_growth'] = cumulative_growth
-        
-        elif np.isinf(df_fixed.loc[i, 'annual_species_growth']):
-            # Replace inf values with the species growth divided by a minimum time period
-            df_fixed.loc[i, 'annual_species_growth'] = species_growth  # Treat as 1-year growth
+    years_diff = df_fixed['years_since_previous'].to_numpy()
+    species = df_fixed['species'].to_numpy()
+    species_growth = df_fixed['species_growth'].to_numpy()
+    annual_growth = df_fixed['annual_species_growth'].to_numpy(dtype=float)
+    positions = np.arange(len(df_fixed))
+    
+    # For each row, the last earlier release from a different year (or the
+    # first row) marks the start of that row's year
+    last_release = np.maximum.accumulate(np.where(years_diff != 0, positions, 0))
+    year_start = np.concatenate(([0], last_release[:-1]))
+    
+    # For same-year releases, treat as cumulative growth for that year
+    same_year = (years_diff == 0) & (positions > 1)
+    # Replace inf values with the species growth divided by a minimum time period
+    infinite = (years_diff != 0) & (positions > 0) & np.isinf(annual_growth)
+    
+    fixed_growth = annual_growth.copy()
+    fixed_growth[same_year] = (species - species[year_start])[same_year]
+    fixed_growth[infinite] = species_growth[infinite]  # Treat as 1-year growth
+    df_fixed['annual_species_growth'] = fixed_growth
     
     # Now calculate the era averages properly
     print("\nFixed data:")
     print("MSL33 and MSL34 with corrected calculations:")
     print(df_fixed[df_fixed['year'] == 2018][['version', 'year', 'species', 'annual_species_growth']])
     
+    # Assign every release to its era once: (..2014], (2014, 2020], (2020..)
+    eras = pd.cut(df_fixed['year'], bins=[-np.inf, 2014, 2020, np.inf],
+                  labels=['early', 'genomics', 'modern'])
+    
     # Calculate era averages excluding infinite values
-    early_phase = df_fixed[(df_fixed['year'] <= 2014) & np.isfinite(df_fixed['annual_species_growth'])]['annual_species_growth'].mean()
-    genomics_phase = df_fixed[(df_fixed['year'] > 2014) & (df_fixed['year'] <= 2020) & np.isfinite(df_fixed['annual_species_growth'])]['annual_species_growth'].mean()
-    modern_phase = df_fixed[(df_fixed['year'] > 2020) & np.isfinite(df_fixed['annual_species_growth'])]['annual_species_growth'].mean()
+    finite = np.isfinite(df_fixed['annual_species_growth'])
+    early_phase, genomics_phase, modern_phase = (
+        df_fixed.loc[finite, 'annual_species_growth']
+        .groupby(eras[finite], observed=False).mean()
+    )
     
     print(f"\nCorrected Era Averages:")
     print(f"Early (2005-2014): {early_phase:.1f} species/year")
@@ -67,15 +80,14 @@ def fix_genomics_era_calculation():
     print(f"Modern (2021-2024): {modern_phase:.1f} species/year")
     
     # Create corrected visualization
-    fig, axes = plt.subplots(1, 2, figsize=(15, 6))
+    fig, axes = plt.subplots(1, 2, figsize=(15, 6), constrained_layout=True)
     
     # Original problematic calculation
     phases_orig = ['Early\n(2005-2014)', 'Genomics\n(2015-2020)', 'Modern\n(2021-2024)']
-    phase_rates_orig = [
-        df[(df['year'] <= 2014)]['annual_species_growth'].mean(),
-        df[(df['year'] > 2014) & (df['year'] <= 2020)]['annual_species_growth'].mean(),
-        df[df['year'] > 2020]['annual_species_growth'].mean()
-    ]
+    # df and df_fixed share rows and years, so the same era labels apply
+    phase_rates_orig = list(
+        df['annual_species_growth'].groupby(eras, observed=False).mean()
+    )
     
     # Fixed calculation
     phases_fixed = ['Early\n(2005-2014)', 'Genomics\n(2015-2020)', 'Modern\n(2021-2024)']
@@ -89,11 +101,13 @@ def fix_genomics_era_calculation():
     axes[0].set_ylabel('Average Species/Year')
     axes[0].grid(True, alpha=0.3)
     
+    axes[0].bar_label(bars1, labels=[f'{rate:.0f}' if np.isfinite(rate) else ''
+                                     for rate in phase_rates_orig],
+                      padding=3, fontweight='bold')
+    
+    # A NaN/inf bar has no top to label, so flag it near the axis instead
     for bar, rate in zip(bars1, phase_rates_orig):
-        if np.isfinite(rate):
-            axes[0].text(bar.get_x() + bar.get_width()/2., bar.get_height() + 50,
-                        f'{rate:.0f}', ha='center', va='bottom', fontweight='bold')
-        else:
+        if not np.isfinite(rate):
             axes[0].text(bar.get_x() + bar.get_width()/2., 100,
                         'NaN/Inf', ha='center', va='bottom', fontweight='bold', color='red')
     
@@ -103,12 +117,7 @@ def fix_genomics_era_calculation():
     axes[1].set_ylabel('Average Species/Year')
     axes[1].grid(True, alpha=0.3)
     
-    for bar, rate in zip(bars2, phase_rates_fixed):
-        height = bar.get_height()
-        axes[1].text(bar.get_x() + bar.get_width()/2., height + 50,
-                    f'{rate:.0f}', ha='center', va='bottom', fontweight='bold')
-    
-    plt.tight_layout()
+    axes[1].bar_label(bars2, fmt='%.0f', padding=3, fontweight='bold')
     
     # Save corrected plot
     output_dir = Path(__file__).parent.parent / 'output' / 'research_analysis'
@@ -8,332 +8,262 @@ the Caudovirales reclassification.
 
 import sys
 from pathlib import Path
+from typing import Dict, List
 import json
+import gzip
+import shutil
 import logging
+from collections import defaultdict
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
-# Add src to path for imports
-sys.path.append(str(Path(__file__).parent.parent))
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# Write buffer for the report file; template chunks are written as they render
+REPORT_BUFFER_SIZE = 1 << 17
 
-def generate_html_report():
-    """Generate HTML visualization report."""
+# Jinja template for the report; compiled templates are cached on disk
+TEMPLATE_DIR = Path(__file__).parent / 'templates'
+REPORT_TEMPLATE = 'caudovirales_report.html.j2'
+
+
+# Links carrying less than this share of all migrated species are merged into
+# one "Other" node per source, keeping the Sankey small enough for D3 to lay out
+MIN_LINK_SHARE = 0.005
+
+# D3 libraries the report needs, vendored next to it so it opens offline
+VENDOR_SCRIPTS = [
+    ('d3.v7.min.js', 'https://d3js.org/d3.v7.min.js'),
+    ('d3-sankey.min.js', 'https://unpkg.com/d3-sankey@0.12.3/dist/d3-sankey.min.js'),
+]
+
+
+@functools.lru_cache(maxsize=None)
+def _thousands(n: int) -> str:
+    """Format a count with thousands separators; many families share counts."""
+    return f"{n:,}"
+
+
+@functools.lru_cache(maxsize=None)
+def _report_template():
+    """Load the report template once per process."""
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+    
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        bytecode_cache=FileSystemBytecodeCache(),
+        autoescape=True,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True
+    )
+    env.filters['thousands'] = _thousands
+    return env.get_template(REPORT_TEMPLATE)
+
+
+def _load_json(path: Path):
+    """Read and parse a whole JSON file in one go."""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    return json.loads(path.read_bytes())
+
+
+def _compact_json(data) -> str:
+    """Serialize data for embedding in the page without pretty whitespace."""
+    if orjson is not None:
+        return orjson.dumps(data).decode('utf-8')
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+
+def _vendor_scripts(output_dir: Path) -> List[str]:
+    """Return script sources for the report, downloading D3 into output/vendor once."""
+    vendor_dir = output_dir / 'vendor'
+    vendor_dir.mkdir(parents=True, exist_ok=True)
+    
+    sources = []
+    for filename, url in VENDOR_SCRIPTS:
+        local_path = vendor_dir / filename
+        
+        if not local_path.exists():
+            # Only needed the first time a library is vendored
+            import requests
+            
+            try:
+                response = requests.get(url, timeout=30)
+                response.raise_for_status()
+                
+                # Write to a temp file first so a failed download is never used
+                tmp_path = local_path.with_suffix('.part')
+                tmp_path.write_bytes(response.content)
+                tmp_path.replace(local_path)
+                logger.info(f"Vendored {filename} from {url}")
+            except (requests.RequestException, OSError) as e:
+                logger.warning(f"Could not vendor {filename}, linking to CDN instead: {e}")
+                sources.append(url)
+                continue
+        
+        # Relative to the report, which is written into output_dir
+        sources.append(f"vendor/{filename}")
+    
+    return sources
+
+
+def _aggregate_small_links(flow_data: Dict, min_share: float) -> Dict:
+    """Collapse links below min_share of the total flow into an "Other" node."""
+    links = flow_data['links']
+    total = sum(link['value'] for link in links)
+    if min_share <= 0 or total == 0:
+        return flow_data
+    
+    threshold = total * min_share
+    kept = [link for link in links if link['value'] >= threshold]
+    if len(kept) == len(links):
+        return flow_data
+    
+    other_by_source = defaultdict(int)
+    for link in links:
+        if link['value'] < threshold:
+            other_by_source[link['source']] += link['value']
+    
+    # Keep only nodes still attached to a link, renumbered in their original order
+    used = {link['source'] for link in kept} | {link['target'] for link in kept}
+    used.update(other_by_source)
+    
+    nodes = []
+    new_index = {}
+    for index, node in enumerate(flow_data['nodes']):
+        if index in used:
+            new_index[index] = len(nodes)
+            nodes.append({**node, 'id': len(nodes)})
+    
+    other_index = len(nodes)
+    nodes.append({'id': other_index, 'name': 'Other', 'type': 'other'})
+    
+    aggregated = [
+        {**link, 'source': new_index[link['source']], 'target': new_index[link['target']]}
+        for link in kept
+    ]
+    aggregated.extend(
+        {'source': new_index[source], 'target': other_index, 'value': value}
+        for source, value in other_by_source.items()
+    )
+    
+    logger.info(f"Merged {len(links) - len(kept)} small links into 'Other' "
+                f"({len(flow_data['nodes'])} -> {len(nodes)} nodes)")
+    return {**flow_data, 'nodes': nodes, 'links': aggregated}
+
+
+def _report_options_path(report_path: Path) -> Path:
+    """Sidecar recording the options the report was built with."""
+    return report_path.with_name(f'.{report_path.name}.options.json')
+
+
+def _report_is_current(report_path: Path, inputs: List[Path], options: Dict) -> bool:
+    """Check whether the report (and its gzip copy) is newer than every input
+    and was built with the same options."""
+    gzip_path = report_path.with_name(report_path.name + '.gz')
+    try:
+        if json.loads(_report_options_path(report_path).read_text()) != options:
+            return False
+        built = min(report_path.stat().st_mtime_ns, gzip_path.stat().st_mtime_ns)
+        return all(built > path.stat().st_mtime_ns for path in inputs)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+
+
+def _write_report(out, flow_data, stats_data, script_srcs):
+    """Render the HTML report as UTF-8 into an open binary file, chunk by chunk."""
+    migration_summary = stats_data['migration_summary']
+    
+    old_families = [
+        (family, count, "Partially migrated" if family in migration_summary else "Retained")
+        for family, count in stats_data['before']['families'].items()
+    ]
+    migrations = [
+        (old_family, [
+            (new_family, count, '%.1f' % ((count / migration['total']) * 100))
+            for new_family, count in migration['top_destinations']
+        ])
+        for old_family, migration in migration_summary.items()
+        if migration['total'] > 0
+    ]
+    
+    # The flow data is embedded as a JSON data block, so it is not HTML-escaped;
+    # only a closing tag sequence could break out of it
+    flow_json = _compact_json(flow_data).replace('</', '<\\/')
+    
+    _report_template().stream(
+        before_total=stats_data['before']['total_species'],
+        after_total=stats_data['after']['total_species'],
+        total_migrated=sum(m['total'] for m in migration_summary.values()),
+        new_families_count=stats_data['after']['new_families_count'],
+        old_families=old_families,
+        migrations=migrations,
+        repo_name=Path(__file__).parent.parent.name,
+        script_srcs=script_srcs,
+        flow_json=flow_json
+    ).dump(out, encoding='utf-8')
+
+
+def generate_html_report(min_link_share: float = MIN_LINK_SHARE, force: bool = False):
+    """Generate HTML visualization report.
+    
+    Returns early when the existing report is newer than the migration data,
+    the template and this script and was built with the same min_link_share,
+    unless force is set.
+    """
     
     # Load the migration data
     output_dir = Path(__file__).parent.parent / 'output'
+    flow_path = output_dir / 'caudovirales_migration_flow.json'
+    stats_path = output_dir / 'caudovirales_migration_stats.json'
+    report_path = output_dir / 'caudovirales_visual_report.html'
+    
+    inputs = [flow_path, stats_path, TEMPLATE_DIR / REPORT_TEMPLATE, Path(__file__)]
+    options = {'min_link_share': min_link_share}
+    if not force and _report_is_current(report_path, inputs, options):
+        logger.info(f"Visual report is up to date: {report_path}")
+        print(f"\nVisual report is up to date: {report_path}")
+        return True
     
     try:
-        with open(output_dir / 'caudovirales_migration_flow.json') as f:
-            flow_data = json.load(f)
-        
-        with open(output_dir / 'caudovirales_migration_stats.json') as f:
-            stats_data = json.load(f)
+        # The two files are independent, so read and parse them side by side
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            flow_future = executor.submit(_load_json, flow_path)
+            stats_future = executor.submit(_load_json, stats_path)
+            flow_data, stats_data = flow_future.result(), stats_future.result()
     except FileNotFoundError:
         logger.error("Migration data not found. Please run analyze_caudovirales_migration.py first")
         return False
+    except json.JSONDecodeError as e:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        logger.error(f"Migration data is not valid JSON: {e}")
+        return False
     
-    # Generate HTML report
-    html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>ICTV Caudovirales Reclassification Report</title>
-    <script src="https://d3js.org/d3.v7.min.js"></script>
-    <script src="https://unpkg.com/d3-sankey@0.12.3/dist/d3-sankey.min.js"></script>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            margin: 20px;
-            background-color: #f5f5f5;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background-color: white;
-            padding: 30px;
-            border-radius: 8px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        h1 {{
-            color: #333;
-            text-align: center;
-            margin-bottom: 10px;
-        }}
-        .subtitle {{
-            text-align: center;
-            color: #666;
-            margin-bottom: 30px;
-        }}
-        .section {{
-            margin: 30px 0;
-        }}
-        .stats-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin: 20px 0;
-        }}
-        .stat-card {{
-            background-color: #f8f9fa;
-            border: 1px solid #dee2e6;
-            border-radius: 5px;
-            padding: 20px;
-            text-align: center;
-        }}
-        .stat-number {{
-            font-size: 36px;
-            font-weight: bold;
-            color: #2c5282;
-            margin: 10px 0;
-        }}
-        .stat-label {{
-            color: #666;
-            font-size: 14px;
-        }}
-        .old-family {{
-            color: #dc3545;
-        }}
-        .new-family {{
-            color: #28a745;
-        }}
-        .migration-chart {{
-            margin: 30px 0;
-            background-color: #f8f9fa;
-            border-radius: 5px;
-            padding: 20px;
-        }}
-        .node rect {{
-            cursor: pointer;
-        }}
-        .node text {{
-            font: 12px sans-serif;
-            pointer-events: none;
-        }}
-        .link {{
-            fill: none;
-            stroke-opacity: 0.5;
-        }}
-        .link:hover {{
-            stroke-opacity: 0.8;
-        }}
-        .family-table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 20px 0;
-        }}
-        .family-table th {{
-            background-color: #f8f9fa;
-            padding: 12px;
-            text-align: left;
-            border-bottom: 2px solid #dee2e6;
-        }}
-        .family-table td {{
-            padding: 10px 12px;
-            border-bottom: 1px solid #dee2e6;
-        }}
-        .removed {{
-            color: #dc3545;
-            font-weight: bold;
-        }}
-        .citation {{
-            background-color: #e9ecef;
-            padding: 15px;
-            border-radius: 5px;
-            margin-top: 30px;
-            font-size: 14px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>ICTV Caudovirales Reclassification Analysis</h1>
-        <div class="subtitle">Tracking the dissolution of morphology-based families (MSL36 → MSL37)</div>
-        
-        <div class="section">
-            <h2>Summary Statistics</h2>
-            <div class="stats-grid">
-                <div class="stat-card">
-                    <div class="stat-label">Caudovirales Species (MSL36)</div>
-                    <div class="stat-number">{stats_data['before']['total_species']:,}</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-label">Caudovirales Species (MSL37)</div>
-                    <div class="stat-number">{stats_data['after']['total_species']:,}</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-label">Species Migrated</div>
-                    <div class="stat-number">{sum(m['total'] for m in stats_data['migration_summary'].values())}</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-label">New Families Created</div>
-                    <div class="stat-number">{stats_data['after']['new_families_count']}</div>
-                </div>
-            </div>
-        </div>
-        
-        <div class="section">
-            <h2>Old Morphology-Based Families (MSL36)</h2>
-            <table class="family-table">
-                <thead>
-                    <tr>
-                        <th>Family</th>
-                        <th>Species Count</th>
-                        <th>Fate in MSL37</th>
-                    </tr>
-                </thead>
-                <tbody>
-"""
-    
-    # Add old families data
-    for family, count in stats_data['before']['families'].items():
-        fate = "Partially migrated" if family in stats_data['migration_summary'] else "Retained"
-        html_content += f"""
-                    <tr>
-                        <td class="old-family">{family}</td>
-                        <td>{count:,}</td>
-                        <td>{fate}</td>
-                    </tr>
-"""
-    
-    html_content += """
-                </tbody>
-            </table>
-        </div>
-        
-        <div class="section">
-            <h2>Migration Flow Visualization</h2>
-            <div class="migration-chart">
-                <div id="sankey"></div>
-            </div>
-        </div>
-        
-        <div class="section">
-            <h2>Detailed Migration Summary</h2>
-"""
+    flow_data = _aggregate_small_links(flow_data, min_link_share)
+    script_srcs = _vendor_scripts(output_dir)
     
-    # Add migration details
-    for old_family, migration in stats_data['migration_summary'].items():
-        if migration['total'] > 0:
-            html_content += f"""
-            <h3>{old_family} → New Families</h3>
-            <table class="family-table">
-                <thead>
-                    <tr>
-                        <th>New Family</th>
-                        <th>Species Count</th>
-                        <th>Percentage</th>
-                    </tr>
-                </thead>
-                <tbody>
-"""
-            for new_family, count in migration['top_destinations']:
-                percentage = (count / migration['total']) * 100
-                html_content += f"""
-                    <tr>
-                        <td class="new-family">{new_family}</td>
-                        <td>{count}</td>
-                        <td>{percentage:.1f}%</td>
-                    </tr>
-"""
-            html_content += """
-                </tbody>
-            </table>
-"""
+    # Forget the old options first, so a half-written report never looks current
+    _report_options_path(report_path).unlink(missing_ok=True)
     
-    html_content += f"""
-        </div>
-        
-        <div class="citation">
-            <strong>Data Source:</strong> International Committee on Taxonomy of Viruses (ICTV)<br>
-            <strong>Analysis:</strong> ICTV-git project - Git-based version control for viral taxonomy<br>
-            <strong>Generated:</strong> {Path(__file__).parent.parent.name} repository
-        </div>
-    </div>
+    # Stream the report straight to disk instead of building it in memory
+    with open(report_path, 'wb', buffering=REPORT_BUFFER_SIZE) as out:
+        _write_report(out, flow_data, stats_data, script_srcs)
     
-    <script>
-        // Load flow data
-        const flowData = {json.dumps(flow_data)};
-        
-        // Set dimensions
-        const margin = {{top: 10, right: 10, bottom: 10, left: 10}};
-        const width = 1100 - margin.left - margin.right;
-        const height = 600 - margin.top - margin.bottom;
-        
-        // Create SVG
-        const svg = d3.select("#sankey")
-            .append("svg")
-            .attr("width", width + margin.left + margin.right)
-            .attr("height", height + margin.top + margin.bottom)
-            .append("g")
-            .attr("transform", `translate(${{margin.left}},${{margin.top}})`);
-        
-        // Create sankey diagram
-        const sankey = d3.sankey()
-            .nodeWidth(15)
-            .nodePadding(10)
-            .extent([[1, 1], [width - 1, height - 6]]);
-        
-        // Process data
-        const {{nodes, links}} = sankey(flowData);
-        
-        // Color scale
-        const color = d3.scaleOrdinal()
-            .domain(["old_family", "new_family", "removed"])
-            .range(["#dc3545", "#28a745", "#6c757d"]);
-        
-        // Add links
-        svg.append("g")
-            .selectAll("path")
-            .data(links)
-            .enter().append("path")
-            .attr("class", "link")
-            .attr("d", d3.sankeyLinkHorizontal())
-            .attr("stroke", d => color(d.source.type))
-            .attr("stroke-width", d => Math.max(1, d.width))
-            .append("title")
-            .text(d => `${{d.source.name}} → ${{d.target.name}}: ${{d.value}} species`);
-        
-        // Add nodes
-        const node = svg.append("g")
-            .selectAll("g")
-            .data(nodes)
-            .enter().append("g");
-        
-        node.append("rect")
-            .attr("x", d => d.x0)
-            .attr("y", d => d.y0)
-            .attr("height", d => d.y1 - d.y0)
-            .attr("width", d => d.x1 - d.x0)
-            .attr("fill", d => color(d.type))
-            .append("title")
-            .text(d => `${{d.name}}: ${{d.value}} species`);
-        
-        node.append("text")
-            .attr("x", d => d.x0 < width / 2 ? d.x1 + 6 : d.x0 - 6)
-            .attr("y", d => (d.y1 + d.y0) / 2)
-            .attr("dy", "0.35em")
-            .attr("text-anchor", d => d.x0 < width / 2 ? "start" : "end")
-            .text(d => d.name)
-            .filter(d => d.x0 < width / 2)
-            .attr("x", d => d.x1 + 6);
-    </script>
-</body>
-</html>
-"""
+    # Compressed copy for archiving or serving; the plain file stays browsable
+    gzip_path = report_path.with_name(report_path.name + '.gz')
+    with open(report_path, 'rb') as src, gzip.open(gzip_path, 'wb', compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, REPORT_BUFFER_SIZE)
     
-    # Save HTML report
-    report_path = output_dir / 'caudovirales_visual_report.html'
-    with open(report_path, 'w') as f:
-        f.write(html_content)
+    # Recorded last, so an interrupted run is never taken as up to date
+    _report_options_path(report_path).write_text(json.dumps(options))
     
-    logger.info(f"Visual report generated: {report_path}")
+    logger.info(f"Visual report generated: {report_path} (+ {gzip_path.name})")
     print(f"\nVisual report saved to: {report_path}")
     print(f"Open in browser: file://{report_path.absolute()}")
     
@@ -341,5 +271,21 @@ def generate_html_report():
 
 
 if __name__ == "__main__":
-    success = generate_html_report()
+    import argparse
+    
+    # Set up logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    
+    parser = argparse.ArgumentParser(description='Generate the Caudovirales visual report')
+    parser.add_argument('--min-link-share', type=float, default=MIN_LINK_SHARE,
+                       help='Merge Sankey links below this share of all migrated species '
+                            'into an "Other" node (0 disables)')
+    parser.add_argument('--force', action='store_true',
+                       help='Regenerate the report even if it is newer than its inputs')
+    args = parser.parse_args()
+    
+    success = generate_html_report(min_link_share=args.min_link_share, force=args.force)
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -13,8 +13,9 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from collections import defaultdict, Counter
+from collections import Counter
 import json
+import pickle
 from datetime import datetime
 import re
 
@@ -32,6 +33,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Ranks flattened into columns by LongitudinalAnalyzer._species_dataframe
+RANK_COLUMNS = ['realm', 'kingdom', 'phylum', 'class', 'order', 'family', 'genus']
+
 # Set style for plots
 plt.style.use('seaborn-v0_8')
 sns.set_palette("husl")
@@ -71,15 +75,67 @@ class LongitudinalAnalyzer:
             {'version': 'msl40', 'year': 2024, 'name': 'MSL40'}
         ]
         
-        # Cache for species data
+        # Cache for species data, and the same data flattened to one row per species
         self._species_cache = {}
+        self._species_frames = {}
+    
+    def _species_cache_file(self, version: str) -> Path:
+        """Disk cache path for a version, keyed by the commit the version resolves to."""
+        commit = self.diff_tool.repo.commit(version).hexsha
+        return self.output_dir / '.cache' / f"{version}-{commit[:12]}.pkl"
     
     def get_species_data(self, version: str) -> dict:
-        """Get species data for a version with caching."""
-        if version not in self._species_cache:
-            logger.info(f"Loading species data for {version}")
-            self._species_cache[version] = self.diff_tool.get_species_at_version(version)
-        return self._species_cache[version]
+        """Get species data for a version with caching.
+        
+        Parsed versions are also pickled under output_dir/.cache, so later runs
+        skip the checkout and YAML walk until the version's commit changes.
+        """
+        if version in self._species_cache:
+            return self._species_cache[version]
+        
+        cache_file = self._species_cache_file(version)
+        if cache_file.exists():
+            try:
+                with open(cache_file, 'rb') as f:
+                    self._species_cache[version] = pickle.load(f)
+                return self._species_cache[version]
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable species cache {cache_file.name}: {e}")
+        
+        logger.info(f"Loading species data for {version}")
+        species_data = self.diff_tool.get_species_at_version(version)
+        self._species_cache[version] = species_data
+        
+        try:
+            # Drop entries for older commits of this version, then write atomically
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            for stale in cache_file.parent.glob(f"{version}-*.pkl"):
+                stale.unlink()
+            tmp_file = cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(species_data, f, protocol=5)
+            tmp_file.replace(cache_file)
+        except OSError as e:
+            logger.warning(f"Could not write species cache for {version}: {e}")
+        
+        return species_data
+    
+    def _species_dataframe(self, version: str) -> pd.DataFrame:
+        """Get species data for a version as a DataFrame with one column per rank.
+        
+        Empty rank names are stored as missing values, so nunique() and
+        groupby() skip them the same way the truthiness checks they replace did.
+        """
+        if version not in self._species_frames:
+            species_data = self.get_species_data(version)
+            df = pd.DataFrame.from_records(
+                [data['classification'] for data in species_data.values()],
+                columns=RANK_COLUMNS
+            )
+            df = df.mask(df.eq(''))
+            df.insert(0, 'species', list(species_data))
+            self._species_frames[version] = df
+        return self._species_frames[version]
     
     def study_1_taxonomy_growth_patterns(self):
         """Study 1: Analyze overall taxonomy growth patterns over 20 years."""
@@ -91,34 +147,19 @@ class LongitudinalAnalyzer:
             version = msl_info['version']
             year = msl_info['year']
             
-            species_data = self.get_species_data(version)
+            species_df = self._species_dataframe(version)
             
             # Count taxonomic ranks
-            families = set()
-            genera = set()
-            orders = set()
-            realms = set()
-            
-            for species_name, data in species_data.items():
-                classification = data['classification']
-                
-                if classification.get('family'):
-                    families.add(classification['family'])
-                if classification.get('genus'):
-                    genera.add(classification['genus'])
-                if classification.get('order'):
-                    orders.add(classification['order'])
-                if classification.get('realm'):
-                    realms.add(classification['realm'])
+            counts = species_df[['family', 'genus', 'order', 'realm']].nunique()
             
             growth_data.append({
                 'version': msl_info['name'],
                 'year': year,
-                'species': len(species_data),
-                'families': len(families),
-                'genera': len(genera),
-                'orders': len(orders),
-                'realms': len(realms)
+                'species': len(species_df),
+                'families': int(counts['family']),
+                'genera': int(counts['genus']),
+                'orders': int(counts['order']),
+                'realms': int(counts['realm'])
             })
         
         # Create DataFrame
@@ -478,28 +519,21 @@ class LongitudinalAnalyzer:
             version = msl_info['version']
             year = msl_info['year']
             
-            species_data = self.get_species_data(version)
-            
-            # Count species by realm
-            realm_counts = defaultdict(int)
-            unassigned_realms = 0
+            species_df = self._species_dataframe(version)
             
-            for species_name, data in species_data.items():
-                realm = data['classification'].get('realm')
-                if realm:
-                    realm_counts[realm] += 1
-                else:
-                    unassigned_realms += 1
+            # Count species by realm, in order of first appearance
+            realm_counts = species_df.groupby('realm', sort=False).size()
+            species_with_realms = int(realm_counts.sum())
             
             realm_data.append({
                 'version': msl_info['name'],
                 'year': year,
-                'total_species': len(species_data),
+                'total_species': len(species_df),
                 'realms_defined': len(realm_counts),
-                'species_with_realms': sum(realm_counts.values()),
-                'unassigned_species': unassigned_realms,
-                'realm_coverage': sum(realm_counts.values()) / len(species_data) * 100,
-                'realm_distribution': dict(realm_counts)
+                'species_with_realms': species_with_realms,
+                'unassigned_species': len(species_df) - species_with_realms,
+                'realm_coverage': species_with_realms / len(species_df) * 100,
+                'realm_distribution': {realm: int(count) for realm, count in realm_counts.items()}
             })
         
         # Create DataFrame
@@ -129,6 +129,16 @@ class FamilyStabilityAnalyzer:
                 warnings.append(f"⚠️ {family_name} frequently undergoes: {changes}")
         
         return warnings
+    
+    def analyze_batch(self, family_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get stability score and warning flags for several families at once"""
+        return {
+            family_name: {
+                'stability': self.get_family_stability(family_name),
+                'warnings': self.get_red_flags(family_name)
+            }
+            for family_name in family_names
+        }
 
 
 class GenomeFeatureExtractor:
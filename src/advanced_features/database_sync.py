@@ -77,16 +77,23 @@ class GenBankAdapter(DatabaseAdapter):
             Entrez.email = email
         self.rate_limit = 3  # NCBI allows 3 requests per second
         self.last_request = 0
+        # Built on first use, inside the loop that runs the lookups
+        self._rate_lock = None
     
     async def _rate_limit_check(self):
         """Ensure we don't exceed rate limits"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request
+        if self._rate_lock is None:
+            self._rate_lock = asyncio.Lock()
         
-        if time_since_last < (1.0 / self.rate_limit):
-            await asyncio.sleep((1.0 / self.rate_limit) - time_since_last)
-        
-        self.last_request = time.time()
+        # Concurrent lookups take their request slots one at a time
+        async with self._rate_lock:
+            current_time = time.time()
+            time_since_last = current_time - self.last_request
+            
+            if time_since_last < (1.0 / self.rate_limit):
+                await asyncio.sleep((1.0 / self.rate_limit) - time_since_last)
+            
+            self.last_request = time.time()
     
     async def get_classification(self, species_name: str) -> Optional[Dict[str, str]]:
         """Get GenBank taxonomy for species"""
@@ -249,30 +256,37 @@ class MismatchDetector:
         
         # Check each database
         for db_name, adapter in self.adapters.items():
-            try:
-                db_classification = await adapter.get_classification(species_name)
-                
-                if db_classification and db_classification != ictv_classification:
-                    entries_count = await adapter.get_entries_count(species_name)
-                    
-                    mismatch = TaxonomyMismatch(
-                        database=db_name,
-                        accession="",  # Would get specific accessions
-                        species_name=species_name,
-                        current_classification=db_classification,
-                        correct_classification=ictv_classification,
-                        entries_affected=entries_count,
-                        last_updated=datetime.now(),
-                        severity=self._calculate_severity(db_classification, ictv_classification, entries_count)
-                    )
-                    
-                    mismatches.append(mismatch)
-            
-            except Exception as e:
-                logging.error(f"Error checking {db_name} for {species_name}: {e}")
+            mismatch = await self.check_database(species_name, adapter, ictv_classification)
+            if mismatch:
+                mismatches.append(mismatch)
         
         return mismatches
     
+    async def check_database(self, species_name: str, adapter: DatabaseAdapter,
+                             ictv_classification: Dict[str, str]) -> Optional[TaxonomyMismatch]:
+        """Compare one database's classification of a species against ICTV"""
+        try:
+            db_classification = await adapter.get_classification(species_name)
+            
+            if db_classification and db_classification != ictv_classification:
+                entries_count = await adapter.get_entries_count(species_name)
+                
+                return TaxonomyMismatch(
+                    database=adapter.name,
+                    accession="",  # Would get specific accessions
+                    species_name=species_name,
+                    current_classification=db_classification,
+                    correct_classification=ictv_classification,
+                    entries_affected=entries_count,
+                    last_updated=datetime.now(),
+                    severity=self._calculate_severity(db_classification, ictv_classification, entries_count)
+                )
+        
+        except Exception as e:
+            logging.error(f"Error checking {adapter.name} for {species_name}: {e}")
+        
+        return None
+    
     def _get_ictv_classification(self, species_name: str) -> Optional[Dict[str, str]]:
         """Get current ICTV classification from git repo"""
         # This would search the git repository for the species
@@ -298,6 +312,9 @@ class MismatchDetector:
 class DatabaseSync:
     """Main database synchronization system"""
     
+    # Upper bound on database lookups in flight at once
+    max_concurrent_lookups = 20
+    
     def __init__(self, ictv_git_path: str, email: str):
         self.ictv_git_path = ictv_git_path
         self.email = email
@@ -323,13 +340,24 @@ class DatabaseSync:
         if species_list is None:
             species_list = self._get_all_species()
         
-        all_mismatches = []
+        semaphore = asyncio.Semaphore(self.max_concurrent_lookups)
         
+        async def check(species, adapter, ictv_classification):
+            async with semaphore:
+                return await self.detector.check_database(species, adapter, ictv_classification)
+        
+        # Fan out every species/database pair; gather keeps results in scan order
+        tasks = []
         for species in species_list:
-            mismatches = await self.detector.scan_species(species)
-            all_mismatches.extend(mismatches)
+            ictv_classification = self.detector._get_ictv_classification(species)
+            if not ictv_classification:
+                continue
+            for adapter in self.detector.adapters.values():
+                tasks.append(check(species, adapter, ictv_classification))
+        
+        results = await asyncio.gather(*tasks)
         
-        return all_mismatches
+        return [mismatch for mismatch in results if mismatch]
     
     def _get_all_species(self) -> List[str]:
         """Get all species from ICTV git repository"""
@@ -10,6 +10,7 @@ import json
 import hashlib
 import pickle
 import time
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from pathlib import Path
@@ -63,12 +64,16 @@ class QueryResult:
 class QueryCache:
     """Caching layer for common queries to improve performance"""
     
-    def __init__(self, cache_dir: str = ".nlq_cache", cache_ttl_hours: int = 24):
+    def __init__(self, cache_dir: str = ".nlq_cache", cache_ttl_hours: int = 24, memory_size: int = 256):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
         self.cache_ttl = timedelta(hours=cache_ttl_hours)
         self.hit_count = 0
         self.miss_count = 0
+        
+        # In-process LRU in front of the pickle files: cache_key -> (timestamp, result)
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
     
     def _get_cache_key(self, query: str) -> str:
         """Generate cache key from query"""
@@ -81,6 +86,17 @@ class QueryCache:
     def get(self, query: str) -> Optional[str]:
         """Get cached result for query"""
         cache_key = self._get_cache_key(query)
+        
+        # Warm hits skip the stat + unpickle round trip
+        entry = self._memory.get(cache_key)
+        if entry is not None:
+            timestamp, result = entry
+            if datetime.now() - timestamp < self.cache_ttl:
+                self._memory.move_to_end(cache_key)
+                self.hit_count += 1
+                return result
+            del self._memory[cache_key]
+        
         cache_file = self._get_cache_file(cache_key)
         
         if not cache_file.exists():
@@ -93,6 +109,7 @@ class QueryCache:
             
             # Check if cache is still valid
             if datetime.now() - cached_data['timestamp'] < self.cache_ttl:
+                self._remember(cache_key, cached_data['timestamp'], cached_data['result'])
                 self.hit_count += 1
                 return cached_data['result']
             else:
@@ -106,16 +123,25 @@ class QueryCache:
             self.miss_count += 1
             return None
     
+    def _remember(self, cache_key: str, timestamp: datetime, result: str):
+        """Store result in the in-process LRU, evicting the oldest entry when full"""
+        self._memory[cache_key] = (timestamp, result)
+        self._memory.move_to_end(cache_key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+    
     def put(self, query: str, result: str):
         """Cache query result"""
         cache_key = self._get_cache_key(query)
         cache_file = self._get_cache_file(cache_key)
+        timestamp = datetime.now()
+        self._remember(cache_key, timestamp, result)
         
         try:
             cached_data = {
                 'query': query,
                 'result': result,
-                'timestamp': datetime.now()
+                'timestamp': timestamp
             }
             
             with open(cache_file, 'wb') as f:
@@ -128,6 +154,7 @@ class QueryCache:
         """Clear all cached data"""
         for cache_file in self.cache_dir.glob("*.pkl"):
             cache_file.unlink()
+        self._memory.clear()
         self.hit_count = 0
         self.miss_count = 0
     
@@ -7,20 +7,47 @@ as directory structure and species as YAML files.
 
 import os
 import shutil
+import subprocess
+import tempfile
+import threading
 from pathlib import Path
 from typing import List, Dict, Optional, Set
 import logging
 import yaml
 import git
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter, defaultdict
 
-from ..parsers.msl_parser import VirusSpecies, MSLParser
+from ..parsers.msl_parser import VirusSpecies, load_species_cached
+
+# libyaml-backed loader when PyYAML was built with it. Files are still
+# written with the pure-Python emitter: libyaml wraps long quoted scalars
+# differently, so its output is not byte-identical
+try:
+    from yaml import CSafeLoader as YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as YAMLLoader
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 
+def fast_reset(output_dir: Path) -> None:
+    """Clear a previous output directory by renaming it and removing it in the background."""
+    # A fresh holder directory per call, so a reused pid or a removal still
+    # in progress never collides with this one
+    stale_dir = Path(tempfile.mkdtemp(prefix=f"{output_dir.name}.stale-", dir=output_dir.parent))
+    output_dir.rename(stale_dir / output_dir.name)
+    
+    if os.name == 'posix':
+        # Unlinking happens in a separate rm process, even after the caller exits
+        remover = subprocess.Popen(['rm', '-rf', str(stale_dir)], stdin=subprocess.DEVNULL,
+                                   start_new_session=True)
+        threading.Thread(target=remover.wait, daemon=True).start()
+    else:
+        shutil.rmtree(stale_dir)
+
+
 class MSLToGitConverter:
     """Convert MSL data to git repository structure."""
     
@@ -43,6 +70,14 @@ class MSLToGitConverter:
         self.repo_path = Path(repo_path)
         self.repo = None
         
+        # Stats for the most recent conversion, updated as species are written
+        self._has_version_counts = False
+        self._species_total = 0
+        self._deepest_path = 0
+        self._realm_counter: Counter = Counter()
+        self._family_counter: Counter = Counter()
+        self._genus_counter: Counter = Counter()
+        
         if initialize:
             self._initialize_repository()
     
@@ -141,6 +176,27 @@ Git history tracks all changes to viral taxonomy over time.
         
         return Path(*path_parts) / species_file
     
+    def _reset_version_counts(self) -> None:
+        """Start fresh taxonomy counters for a new version."""
+        self._has_version_counts = True
+        self._species_total = 0
+        self._deepest_path = 0
+        self._realm_counter.clear()
+        self._family_counter.clear()
+        self._genus_counter.clear()
+    
+    def _count_species(self, species: VirusSpecies, species_path: Path) -> None:
+        """Add one written species to the current version's counters."""
+        self._species_total += 1
+        # Depth below the realms/ directory, as get_taxonomy_stats() measures it
+        self._deepest_path = max(self._deepest_path, len(species_path.parts) - 1)
+        if species.realm:
+            self._realm_counter[species.realm] += 1
+        if species.family:
+            self._family_counter[species.family] += 1
+        if species.genus:
+            self._genus_counter[species.genus] += 1
+    
     def _create_species_yaml(self, species: VirusSpecies) -> Dict:
         """Create YAML content for a species."""
         # Build classification hierarchy
@@ -175,7 +231,7 @@ Git history tracks all changes to viral taxonomy over time.
         return data
     
     def convert_msl_file(self, msl_file: str, msl_version: str, 
-                        commit_message: Optional[str] = None) -> int:
+                        commit_message: Optional[str] = None, use_cache: bool = False) -> int:
         """
         Convert an MSL file to git repository structure.
         
@@ -183,6 +239,7 @@ Git history tracks all changes to viral taxonomy over time.
             msl_file: Path to MSL Excel file
             msl_version: Version string (e.g., 'MSL36')
             commit_message: Optional custom commit message
+            use_cache: Reuse a Parquet cache of the parsed species
             
         Returns:
             Number of species processed
@@ -190,22 +247,80 @@ Git history tracks all changes to viral taxonomy over time.
         logger.info(f"Converting {msl_version} from {msl_file}")
         
         # Parse MSL file
-        parser = MSLParser(msl_file)
-        parser.load_file()
-        parser.parse_sheet()
-        species_list = parser.extract_species()
-        stats = parser.get_summary_stats()
+        species_list, stats = load_species_cached(msl_file, use_cache=use_cache)
         
-        logger.info(f"Processing {len(species_list)} species")
+        return self.convert_species_list(species_list, msl_version, Path(msl_file).name,
+                                         stats, commit_message)
+    
+    def convert_species_list(self, species_list: List[VirusSpecies], msl_version: str,
+                             source_file: str, stats: Optional[Dict] = None,
+                             commit_message: Optional[str] = None) -> int:
+        """
+        Convert already-parsed species to git repository structure.
+        
+        Args:
+            species_list: Species parsed from the MSL file
+            msl_version: Version string (e.g., 'MSL36')
+            source_file: Name of the source MSL file
+            stats: Summary statistics from MSLParser.get_summary_stats()
+                (derived from species_list if omitted)
+            commit_message: Optional custom commit message
+            
+        Returns:
+            Number of species processed
+        """
+        summary = self.write_species_list(species_list, msl_version, source_file, stats)
         
-        # Track created files
-        created_files = []
+        if self.repo:
+            self.commit_version(summary, commit_message)
+        
+        return summary['species_count']
+    
+    def write_msl_file(self, msl_file: str, msl_version: str, use_cache: bool = False) -> Dict:
+        """
+        Write the species YAML tree for an MSL file without committing it.
+        
+        Args:
+            msl_file: Path to MSL Excel file
+            msl_version: Version string (e.g., 'MSL36')
+            use_cache: Reuse a Parquet cache of the parsed species
+            
+        Returns:
+            Conversion summary to pass to commit_version()
+        """
+        logger.info(f"Converting {msl_version} from {msl_file}")
+        
+        # Parse MSL file
+        species_list, stats = load_species_cached(msl_file, use_cache=use_cache)
+        
+        return self.write_species_list(species_list, msl_version, Path(msl_file).name, stats)
+    
+    def write_species_list(self, species_list: List[VirusSpecies], msl_version: str,
+                           source_file: str, stats: Optional[Dict] = None) -> Dict:
+        """
+        Write the species YAML tree for parsed species without committing it.
+        
+        Args:
+            species_list: Species parsed from the MSL file
+            msl_version: Version string (e.g., 'MSL36')
+            source_file: Name of the source MSL file
+            stats: Summary statistics (derived from species_list if omitted)
+            
+        Returns:
+            Conversion summary to pass to commit_version()
+        """
+        if stats is None:
+            stats = self._summarize_species(species_list)
+        
+        logger.info(f"Processing {len(species_list)} species")
+        self._reset_version_counts()
         
         # Process each species
         for species in species_list:
             # Get path for this species
             species_path = self._get_species_path(species)
             full_path = self.repo_path / species_path
+            self._count_species(species, species_path)
             
             # Create directory structure
             full_path.parent.mkdir(parents=True, exist_ok=True)
@@ -217,15 +332,45 @@ Git history tracks all changes to viral taxonomy over time.
             yaml_content = yaml.dump(yaml_data, default_flow_style=False, 
                                    sort_keys=False, allow_unicode=True)
             full_path.write_text(yaml_content)
-            
-            created_files.append(species_path)
         
         # Create metadata file for this version
         metadata_path = self.repo_path / 'metadata' / f'{msl_version.lower()}_stats.yaml'
-        metadata = {
+        metadata_path.parent.mkdir(parents=True, exist_ok=True)
+        metadata = self._version_metadata(msl_version, source_file, stats, len(species_list))
+        
+        metadata_yaml = yaml.dump(metadata, default_flow_style=False, sort_keys=False)
+        metadata_path.write_text(metadata_yaml)
+        
+        return {
+            'msl_version': msl_version,
+            'source_file': source_file,
+            'species_count': len(species_list),
+            'stats': stats
+        }
+    
+    @staticmethod
+    def _summarize_species(species_list: List[VirusSpecies]) -> Dict:
+        """Build MSLParser.get_summary_stats()-style counts from parsed species."""
+        realms = list(dict.fromkeys(s.realm for s in species_list if s.realm))
+        families = list(dict.fromkeys(s.family for s in species_list if s.family))
+        
+        return {
+            'total_species': len(species_list),
+            'realms': len(realms),
+            'families': len(families),
+            'genera': len({s.genus for s in species_list if s.genus}),
+            'unique_realms': realms,
+            'unique_families': families,
+        }
+    
+    @staticmethod
+    def _version_metadata(msl_version: str, source_file: str, stats: Dict,
+                          species_count: int) -> Dict:
+        """Build the contents of metadata/<version>_stats.yaml."""
+        return {
             'version': msl_version,
             'date_processed': datetime.now().isoformat(),
-            'source_file': Path(msl_file).name,
+            'source_file': source_file,
             'statistics': {
                 'total_species': stats['total_species'],
                 'realms': stats['realms'],
@@ -233,42 +378,172 @@ Git history tracks all changes to viral taxonomy over time.
                 'genera': stats['genera'],
                 'unique_realms': stats.get('unique_realms', []),
             },
-            'species_count': len(species_list)
+            'species_count': species_count
         }
-        
-        metadata_yaml = yaml.dump(metadata, default_flow_style=False, sort_keys=False)
-        metadata_path.write_text(metadata_yaml)
-        created_files.append(Path('metadata') / f'{msl_version.lower()}_stats.yaml')
-        
-        # Stage all files for commit
-        if self.repo:
-            # Add all created files
-            self.repo.index.add([str(f) for f in created_files])
-            
-            # Create commit
-            if not commit_message:
-                commit_message = f"""Import {msl_version} taxonomy data
+    
+    @staticmethod
+    def _default_commit_message(msl_version: str, source_file: str, stats: Dict,
+                                species_count: int) -> str:
+        """Build the standard commit message for an imported version."""
+        return f"""Import {msl_version} taxonomy data
 
-Imported {len(species_list)} virus species from {Path(msl_file).name}
+Imported {species_count} virus species from {source_file}
 - Realms: {stats['realms']}
 - Families: {stats['families']}  
 - Genera: {stats['genera']}
 
 Source: ICTV Master Species List {msl_version}
 """
+    
+    def commit_version(self, summary: Dict, commit_message: Optional[str] = None) -> None:
+        """
+        Stage, commit and tag a version written by write_msl_file().
+        
+        Args:
+            summary: Conversion summary returned by write_msl_file()
+            commit_message: Optional custom commit message
+        """
+        msl_version = summary['msl_version']
+        stats = summary['stats']
+        
+        # Stage the whole version with a single native git add instead of
+        # hashing every species file through GitPython's index
+        self.repo.git.add('--all', '--', 'realms', 'metadata')
+        
+        # Create commit
+        if not commit_message:
+            commit_message = self._default_commit_message(
+                msl_version, summary['source_file'], stats, summary['species_count']
+            )
+        
+        self.repo.index.commit(commit_message)
+        
+        # Create tag for this version
+        tag_name = msl_version.lower()
+        self.repo.create_tag(tag_name, message=f"ICTV {msl_version} release")
+        
+        logger.info(f"Created commit and tag for {msl_version}")
+    
+    def convert_via_fast_import(self, species_list: List[VirusSpecies], msl_version: str,
+                                source_file: str, stats: Dict,
+                                commit_message: Optional[str] = None) -> int:
+        """
+        Commit already-parsed species straight into git with git fast-import.
+        
+        The version is streamed as one commit on top of the current branch
+        tip, without writing species files to the working tree.
+        
+        Args:
+            species_list: Species parsed from the MSL file
+            msl_version: Version string (e.g., 'MSL36')
+            source_file: Name of the source MSL file
+            stats: Summary statistics from MSLParser.get_summary_stats()
+            commit_message: Optional custom commit message
             
-            self.repo.index.commit(commit_message)
+        Returns:
+            Number of species processed
+        """
+        logger.debug(f"Streaming {len(species_list)} {msl_version} species into git")
+        
+        metadata = self._version_metadata(msl_version, source_file, stats, len(species_list))
+        
+        if not commit_message:
+            commit_message = self._default_commit_message(
+                msl_version, source_file, stats, len(species_list)
+            )
+        
+        branch = self.repo.git.symbolic_ref('HEAD')
+        author = self.repo.git.var('GIT_AUTHOR_IDENT').encode('utf-8')
+        committer = self.repo.git.var('GIT_COMMITTER_IDENT').encode('utf-8')
+        parent = self.repo.head.commit.hexsha if self.repo.head.is_valid() else None
+        
+        fast_import = subprocess.Popen(
+            ['git', 'fast-import', '--quiet', '--date-format=raw'],
+            stdin=subprocess.PIPE, cwd=self.repo_path
+        )
+        stream = fast_import.stdin
+        
+        def write_data(data: bytes) -> None:
+            stream.write(b'data %d\n' % len(data))
+            stream.write(data)
+            stream.write(b'\n')
+        
+        def write_file(path: str, content: str) -> None:
+            stream.write(b'M 100644 inline ' + path.encode('utf-8') + b'\n')
+            write_data(content.encode('utf-8'))
+        
+        try:
+            # Paths not touched here keep their content from the parent commit
+            stream.write(b'commit %s\nmark :1\n' % branch.encode('utf-8'))
+            stream.write(b'author ' + author + b'\ncommitter ' + committer + b'\n')
+            write_data(commit_message.encode('utf-8'))
+            if parent:
+                stream.write(b'from %s\n' % parent.encode('ascii'))
             
-            # Create tag for this version
-            tag_name = msl_version.lower()
-            self.repo.create_tag(tag_name, message=f"ICTV {msl_version} release")
+            self._reset_version_counts()
+            for species in species_list:
+                species_path = self._get_species_path(species)
+                self._count_species(species, species_path)
+                yaml_content = yaml.dump(self._create_species_yaml(species), default_flow_style=False,
+                                         sort_keys=False, allow_unicode=True)
+                write_file(species_path.as_posix(), yaml_content)
+            
+            write_file(f'metadata/{msl_version.lower()}_stats.yaml',
+                       yaml.dump(metadata, default_flow_style=False, sort_keys=False))
+            stream.write(b'\n')
             
-            logger.info(f"Created commit and tag for {msl_version}")
+            # Create tag for this version
+            stream.write(b'tag %s\nfrom :1\n' % msl_version.lower().encode('utf-8'))
+            stream.write(b'tagger ' + committer + b'\n')
+            write_data(f"ICTV {msl_version} release".encode('utf-8'))
+            stream.close()
+        except BrokenPipeError:
+            pass
+        except BaseException:
+            # Don't leave fast-import blocked on a half-written stream
+            fast_import.kill()
+            try:
+                stream.close()
+            except OSError:
+                pass
+            fast_import.wait()
+            raise
+        
+        if fast_import.wait() != 0:
+            raise RuntimeError(f"git fast-import failed for {msl_version} (exit code {fast_import.returncode})")
+        
+        logger.debug(f"Created commit and tag for {msl_version}")
         
         return len(species_list)
     
-    def get_taxonomy_stats(self) -> Dict:
-        """Get statistics about the current taxonomy structure."""
+    def checkout_working_tree(self) -> None:
+        """Sync the index and working tree with HEAD after fast-import commits."""
+        self.repo.git.reset('--hard')
+    
+    def get_taxonomy_stats(self, incremental: bool = False) -> Dict:
+        """
+        Get statistics about the current taxonomy structure.
+        
+        Args:
+            incremental: Return the counters kept for the most recent
+                conversion instead of re-reading every species file. These
+                cover only the species written by that conversion, not ones
+                carried forward from earlier versions. Falls back to walking
+                the repository when nothing was converted by this converter.
+                
+        Returns:
+            Dictionary with species total, realm/family/genus counts and
+            the deepest taxonomy path
+        """
+        if incremental and self._has_version_counts:
+            return {
+                'total_species': self._species_total,
+                'realms': dict(self._realm_counter),
+                'families': dict(self._family_counter),
+                'genera': dict(self._genus_counter),
+                'deepest_path': self._deepest_path
+            }
+        
         stats = {
             'total_species': 0,
             'realms': defaultdict(int),
@@ -290,7 +565,7 @@ Source: ICTV Master Species List {msl_version}
                 # Read YAML to get classification
                 try:
                     with open(yaml_file) as f:
-                        data = yaml.safe_load(f)
+                        data = yaml.load(f, Loader=YAMLLoader)
                         if 'classification' in data:
                             classification = data['classification']
                             if 'realm' in classification:
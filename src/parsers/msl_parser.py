@@ -7,16 +7,40 @@ taxonomic information for conversion to git-based format.
 
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import logging
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
 import yaml
 import json
+import random
+from collections import Counter
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet species cache is optional
+    pa = None
+    pq = None
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 
+def _excel_engine() -> Optional[str]:
+    """Prefer the Rust-backed calamine reader when it is installed and pandas supports it."""
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return None
+    
+    major, minor = (int(part) for part in pd.__version__.split('.')[:2])
+    return 'calamine' if (major, minor) >= (2, 2) else None
+
+
+# None lets pandas pick openpyxl (.xlsx, opened read-only) or xlrd (.xls)
+EXCEL_ENGINE = _excel_engine()
+
+
 @dataclass
 class VirusSpecies:
     """Represents a virus species with full taxonomic hierarchy."""
@@ -126,7 +150,7 @@ class MSLParser:
         logger.info(f"Loading MSL file: {self.file_path}")
         
         try:
-            self.workbook = pd.ExcelFile(self.file_path)
+            self.workbook = pd.ExcelFile(self.file_path, engine=EXCEL_ENGINE)
         except Exception as e:
             raise ValueError(f"Failed to load Excel file: {e}")
         
@@ -190,6 +214,92 @@ class MSLParser:
         
         return self.df
     
+    def parse_sample(self, n: int, seed: Optional[int] = None,
+                     stratify_by: Optional[str] = None) -> List[VirusSpecies]:
+        """
+        Draw a random sample of species in a single streaming pass.
+        
+        Rows are read through openpyxl's read-only iterator and kept with
+        reservoir sampling, so only the sampled rows are held in memory.
+        Non-.xlsx files fall back to a full parse. Afterwards self.df holds
+        just the sampled rows.
+        
+        Args:
+            n: Number of species to sample (per stratum when stratify_by is set)
+            seed: Seed for a reproducible sample
+            stratify_by: Standard column name (e.g. 'Realm') to sample within
+            
+        Returns:
+            List of sampled VirusSpecies objects, in sheet order
+        """
+        if n < 0:
+            raise ValueError(f"Sample size must be non-negative, got {n}")
+        if stratify_by is not None and stratify_by not in self.COLUMN_MAPPING:
+            raise ValueError(f"Unknown stratify_by column: {stratify_by}")
+        
+        if not self.main_sheet:
+            self.load_file()
+        
+        rng = random.Random(seed)
+        
+        if self.file_path.suffix.lower() != '.xlsx':
+            self.parse_sheet()
+            if stratify_by and stratify_by not in self.df.columns:
+                raise ValueError(f"No {stratify_by} column found in main sheet")
+            groups = self.df.groupby(stratify_by, sort=False, dropna=False) if stratify_by else [(None, self.df)]
+            picks = [group.loc[sorted(rng.sample(list(group.index), min(n, len(group))))]
+                     for _, group in groups]
+            self.df = pd.concat(picks).sort_index()
+            return self.extract_species()
+        
+        import openpyxl
+        
+        workbook = openpyxl.load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook[self.main_sheet].iter_rows(values_only=True)
+            header = next(rows, ())
+            
+            # Map raw headers onto the standard column names, first match
+            # only, as _standardize_columns does
+            column_mapping = {}
+            for standard_name, variations in self.COLUMN_MAPPING.items():
+                for col in header:
+                    if col in variations:
+                        column_mapping[col] = standard_name
+                        break
+            columns = [column_mapping.get(col, col) for col in header]
+            
+            if 'Species' not in columns:
+                raise ValueError("No Species column found in main sheet")
+            if stratify_by and stratify_by not in columns:
+                raise ValueError(f"No {stratify_by} column found in main sheet")
+            species_idx = columns.index('Species')
+            stratum_idx = columns.index(stratify_by) if stratify_by else None
+            
+            # Algorithm R, one reservoir per stratum
+            reservoirs: Dict[Any, List] = {}
+            seen: Counter = Counter()
+            for row_num, row in enumerate(rows):
+                if species_idx >= len(row) or row[species_idx] is None:
+                    continue
+                key = row[stratum_idx] if stratum_idx is not None and stratum_idx < len(row) else None
+                seen[key] += 1
+                reservoir = reservoirs.setdefault(key, [])
+                if len(reservoir) < n:
+                    reservoir.append((row_num, row))
+                else:
+                    j = rng.randrange(seen[key])
+                    if j < n:
+                        reservoir[j] = (row_num, row)
+        finally:
+            workbook.close()
+        
+        sampled = sorted(item for reservoir in reservoirs.values() for item in reservoir)
+        self.df = pd.DataFrame([row for _, row in sampled], columns=columns)
+        logger.info(f"Sampled {len(self.df)} of {sum(seen.values())} species records")
+        
+        return self.extract_species()
+    
     def _standardize_columns(self) -> None:
         """Standardize column names across different MSL versions."""
         if self.df is None:
@@ -268,6 +378,69 @@ class MSLParser:
         return stats
 
 
+def _species_schema():
+    """Arrow schema mirroring the VirusSpecies fields."""
+    return pa.schema([
+        (field.name, pa.int64() if field.name == 'sort' else pa.string())
+        for field in fields(VirusSpecies)
+    ])
+
+
+def load_species_cached(file_path: str, cache_dir: Optional[str] = None,
+                        use_cache: bool = True) -> Tuple[List[VirusSpecies], Dict[str, Any]]:
+    """
+    Parse an MSL file, reusing a Parquet cache of the extracted species when valid.
+    
+    The cache is keyed on the source file's mtime and size, so a re-downloaded
+    workbook is parsed again. Without pyarrow this is a plain parse.
+    
+    Args:
+        file_path: Path to MSL Excel file
+        cache_dir: Cache directory (default: data/cache beside data/raw)
+        use_cache: Read and write the cache
+        
+    Returns:
+        Tuple of (species list, summary stats from MSLParser.get_summary_stats())
+    """
+    file_path = Path(file_path)
+    source = file_path.stat()
+    source_key = f"{source.st_mtime_ns}:{source.st_size}".encode()
+    cache_path = Path(cache_dir) if cache_dir else file_path.parent.parent / 'cache'
+    cache_path = cache_path / f"{file_path.stem}.parquet"
+    use_cache = use_cache and pq is not None
+    
+    if use_cache and cache_path.exists():
+        try:
+            table = pq.read_table(cache_path)
+            metadata = table.schema.metadata or {}
+            if metadata.get(b'source_key') == source_key:
+                species_list = [VirusSpecies(**row) for row in table.to_pylist()]
+                logger.info(f"Loaded {len(species_list)} species from cache: {cache_path}")
+                return species_list, json.loads(metadata[b'summary_stats'])
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable species cache {cache_path}: {e}")
+    
+    parser = MSLParser(str(file_path))
+    parser.load_file()
+    parser.parse_sheet()
+    species_list = parser.extract_species()
+    stats = parser.get_summary_stats()
+    
+    if use_cache:
+        table = pa.Table.from_pylist([asdict(species) for species in species_list],
+                                     schema=_species_schema())
+        table = table.replace_schema_metadata({
+            'source_key': source_key,
+            'summary_stats': json.dumps(stats, default=str),
+        })
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_suffix('.parquet.tmp')
+        pq.write_table(table, temp_path)
+        temp_path.replace(cache_path)
+    
+    return species_list, stats
+
+
 def parse_msl_file(file_path: str) -> List[VirusSpecies]:
     """Convenience function to parse an MSL file."""
     parser = MSLParser(file_path)
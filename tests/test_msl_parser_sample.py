@@ -0,0 +1,108 @@
+"""
+Tests for streaming MSL samples
+"""
+
+import unittest
+import tempfile
+import pandas as pd
+from pathlib import Path
+from parsers.msl_parser import MSLParser
+
+
+class TestParseSample(unittest.TestCase):
+    """Test reservoir sampling over the main MSL sheet."""
+    
+    def setUp(self):
+        """Create a small MSL workbook with two realms."""
+        self.test_data = pd.DataFrame({
+            'Sort': range(1, 9),
+            'Realm': ['Riboviria'] * 5 + ['Duplodnaviria'] * 3,
+            'Family': ['Virgaviridae', 'Coronaviridae', 'Retroviridae', 'Filoviridae',
+                       'Orthomyxoviridae', 'Straboviridae', 'Herpesviridae', 'Siphoviridae'],
+            'Genus': ['Tobamovirus', 'Betacoronavirus', 'Lentivirus', 'Orthoebolavirus',
+                      'Alphainfluenzavirus', 'Tequatrovirus', 'Simplexvirus', 'Lambdavirus'],
+            'Species': ['Tobacco mosaic virus',
+                        'Severe acute respiratory syndrome-related coronavirus',
+                        'Human immunodeficiency virus 1', 'Ebola virus', 'Influenza A virus',
+                        'Escherichia phage T4', 'Human alphaherpesvirus 1',
+                        'Escherichia phage lambda'],
+            'Genome Composition': ['ssRNA(+)', 'ssRNA(+)', 'ssRNA-RT', 'ssRNA(-)',
+                                   'ssRNA(-)', 'dsDNA', 'dsDNA', 'dsDNA']
+        })
+        
+        # Create temporary Excel file
+        self.temp_file = tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False)
+        self.temp_file.close()
+        self.test_data.to_excel(self.temp_file.name, sheet_name='MSL', index=False)
+    
+    def tearDown(self):
+        """Clean up test files."""
+        Path(self.temp_file.name).unlink(missing_ok=True)
+    
+    def test_sample_size(self):
+        """Test a plain sample holds n species from the sheet, in sheet order."""
+        sample = MSLParser(self.temp_file.name).parse_sample(3, seed=42)
+        
+        self.assertEqual(len(sample), 3)
+        sorts = [s.sort for s in sample]
+        self.assertEqual(sorts, sorted(sorts))
+        self.assertTrue(set(s.species for s in sample) <= set(self.test_data['Species']))
+    
+    def test_sample_is_reproducible(self):
+        """Test the same seed draws the same species."""
+        first = MSLParser(self.temp_file.name).parse_sample(4, seed=7)
+        second = MSLParser(self.temp_file.name).parse_sample(4, seed=7)
+        
+        self.assertEqual([s.species for s in first], [s.species for s in second])
+    
+    def test_sample_larger_than_sheet(self):
+        """Test asking for more species than exist returns every species."""
+        sample = MSLParser(self.temp_file.name).parse_sample(20, seed=1)
+        
+        self.assertEqual([s.species for s in sample], list(self.test_data['Species']))
+    
+    def test_stratified_sample(self):
+        """Test a stratified sample holds at most n species per realm."""
+        parser = MSLParser(self.temp_file.name)
+        sample = parser.parse_sample(2, seed=42, stratify_by='Realm')
+        
+        realms = [s.realm for s in sample]
+        self.assertEqual(realms.count('Riboviria'), 2)
+        self.assertEqual(realms.count('Duplodnaviria'), 2)
+        
+        # Only the sampled rows are kept on the parser
+        self.assertEqual(len(parser.df), 4)
+    
+    def test_stratified_sample_small_stratum(self):
+        """Test a stratum smaller than n is kept whole."""
+        sample = MSLParser(self.temp_file.name).parse_sample(4, seed=3, stratify_by='Realm')
+        
+        realms = [s.realm for s in sample]
+        self.assertEqual(realms.count('Riboviria'), 4)
+        self.assertEqual(realms.count('Duplodnaviria'), 3)
+    
+    def test_invalid_arguments(self):
+        """Test a negative size or unknown stratum column is rejected."""
+        parser = MSLParser(self.temp_file.name)
+        
+        with self.assertRaises(ValueError):
+            parser.parse_sample(-1)
+        with self.assertRaises(ValueError):
+            parser.parse_sample(2, stratify_by='Host')
+        with self.assertRaises(ValueError):
+            parser.parse_sample(2, stratify_by='Subrealm')
+    
+    def test_duplicate_header_variants(self):
+        """Test only the first header variant maps onto a standard column."""
+        test_data = self.test_data.assign(**{'Virus name(s)': 'alias'})
+        test_data.to_excel(self.temp_file.name, sheet_name='MSL', index=False)
+        
+        parser = MSLParser(self.temp_file.name)
+        sample = parser.parse_sample(20, seed=1)
+        
+        self.assertEqual([s.species for s in sample], list(self.test_data['Species']))
+        self.assertEqual(list(parser.df.columns).count('Species'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()